@@ -0,0 +1,165 @@
+"""
+search benchmark against a synthetic database, nothing in the real databases is touched.
+
+    python benchmarks/search.py --scale 1 --repeat 9
+    python benchmarks/search.py --scale 5 --engine python
+"""
+import argparse, gc, os, random, sys, tempfile, time, tracemalloc
+
+sys.path.insert(0, os.sep.join(__file__.split(os.sep)[:-2]))
+from benchmarks.synthetic import make_databases
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# the examples from the README first, then a spread over every kind of smartkey
+QUERIES: list[str] = [
+    'power>5', 'power!=7', 'setcode=LRW', 'creature=true', 'rarity=common', 'legal=commander', 'legal!=legacy',
+    'color=temur', 'year<ORI', 'year>2011', 'owned=true',
+    'textbox=draw', 'textbox="draw a card"', 'name=dragon', 'type=goblin', 'artist=stone', 'keywords=flying',
+    'cmc=3', 'cmc=2-4', 'toughness<=2', 'number<100', 'expansion=dragon', 'setcode>=M10', 'year=2005',
+    'banned=modern', 'restricted=vintage', 'multicolor=true', 'stupid=true', 'cost=g',
+    'creature power>3 cmc<4', 'legal=commander cmc<3 creature', 'type=instant textbox=counter',
+    'name=dragon setcode!=LRW number<100', 'year>2011 rarity=rare owned=true', 'artist=e name=a cmc>2',
+]
+
+# what the parser from before the single pass gave for queries that join terms with _,+ instead of spaces
+PARSES: dict[str, list[tuple]] = {
+    'cmc=3,power>2': [('cmc', '==', 3), ('power', '>', 2)],
+    'num=7_code>=banned+lrw': [('number', '==', 7), ('setcode', '>=', 'banned'), ('setcode', '>=', 'lrw')],
+    'owned!=false,y<type': [('owned', '==', True), ('year', '<', 'type')],
+    'cmc=2 power=1,toughness=1': [('cmc', '==', 2), ('power', '==', 1), ('toughness', '==', 1)],
+    'cmc=3,4,power>2 goblin': [('cmc', '==', 3), ('cmc', '==', 4), ('name', '==', 'goblin'), ('power', '>', 2)],
+    'type=elf,goblin,cmc>2': [('type', '==', 'cmc>2'), ('type', '==', 'elf'), ('type', '==', 'goblin')],
+}
+
+def check_parses() -> bool:
+    from useful.breakdown import SmartArgs, smartkeys
+    ok: bool = True
+    for query, expected in PARSES.items():
+        parsed: list[tuple] = [tuple(x) for x in SmartArgs(query=query, smartkeys=smartkeys)]
+        if parsed != expected:
+            print(f'\33[31mparser mismatch\33[0m {query!r}: {parsed} expected {expected}', flush=True)
+            ok = False
+    return ok
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered: list[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def prepare(directory: str, scale: float, reuse: bool) -> dict[str, str]:
+    paths: dict[str, str] = {x: f'{directory}{os.sep}{x}.sqlite' for x in ['quick_db', 'legal_db', 'setcode_prices']}
+    if not reuse or not all(os.path.exists(x) for x in paths.values()):
+        paths = make_databases(directory, scale=scale)
+
+    # the database module reads these when its first imported, so they have to point elsewhere before that
+    import useful.update_database as update_database
+    update_database.db_path_card_datas = paths['quick_db']
+    update_database.legal_card_datas = paths['legal_db']
+    update_database.price_datas = paths['setcode_prices']
+    update_database.user_datas = f'{directory}{os.sep}user_datas.sqlite'
+    return paths
+
+def prepare_owned(directory: str, fraction: float = 0.05):
+    """the collection lives in user_datas.sqlite inside directory, prepare pointed it there"""
+    from useful.database import MTGData, Card, Owned
+    scryfall_ids: list[str] = [card[Card.scryfall_id] for bag in MTGData.NAME_BAG.values() for card in bag.cards]
+    owned: set[str] = set(random.Random(3).sample(scryfall_ids, int(len(scryfall_ids) * fraction)))
+    [Owned.set_quantity(x, False, 0) for x in Owned.get_owned() - owned]
+    [Owned.set_quantity(x, False, 1) for x in owned]
+    Owned.flush()
+
+def run(repeat: int, engine: str, cached: bool) -> list[dict]:
+    from useful.breakdown import SearchCache, SmartArgs, SmartVal, search_cards, smartkeys, tweak_smartvals
+    from useful.columns import CardColumns
+    from useful.database import Legalities
+    if engine in ['python']:
+        CardColumns.enabled = False
+
+    Legalities.wait()
+    reports: list[dict] = []
+    for query in QUERIES:
+        timer_start: float = time.perf_counter()
+        tweaked: list[SmartVal] = tweak_smartvals(query)
+        tweak_ms: float = (time.perf_counter() - timer_start) * 1000
+
+        timer_start: float = time.perf_counter()
+        SmartArgs(query=query, smartkeys=smartkeys)
+        parse_ms: float = (time.perf_counter() - timer_start) * 1000
+
+        # first run pays for lazy indexes, reported on its own
+        SearchCache.clear()
+        timer_start: float = time.perf_counter()
+        results: int = len(search_cards(tweaked))
+        first_ms: float = (time.perf_counter() - timer_start) * 1000
+
+        timings: list[float] = []
+        for _ in range(repeat):
+            SearchCache.clear() if not cached else ...
+            timer_start: float = time.perf_counter()
+            search_cards(tweaked)
+            timings.append((time.perf_counter() - timer_start) * 1000)
+
+        SearchCache.clear()
+        gc.collect()
+        tracemalloc.start()
+        search_cards(tweaked)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        reports.append(dict(
+            query=query,
+            results=results,
+            tweak=tweak_ms,
+            parse=parse_ms,
+            first=first_ms,
+            p50=percentile(timings, 0.50),
+            p95=percentile(timings, 0.95),
+            max=max(timings),
+            peak_kb=peak / 1024,
+        ))
+
+    return reports
+
+def print_reports(reports: list[dict]):
+    header: str = f'{"query":<40}{"results":>9}{"tweak":>8}{"parse":>8}{"first":>9}{"p50":>9}{"p95":>9}{"max":>9}{"peak kb":>10}'
+    print(header)
+    print('-' * len(header))
+    for x in reports:
+        print(f'{x["query"][:39]:<40}{x["results"]:>9}{x["tweak"]:>8.2f}{x["parse"]:>8.2f}{x["first"]:>9.1f}'
+              f'{x["p50"]:>9.1f}{x["p95"]:>9.1f}{x["max"]:>9.1f}{x["peak_kb"]:>10.0f}')
+
+    p50s: list[float] = [x['p50'] for x in reports]
+    print('-' * len(header))
+    print(f'corpus p50 {percentile(p50s, 0.50):.1f} ms, p95 {percentile(p50s, 0.95):.1f} ms, max {max(p50s):.1f} ms, '
+          f'sum {sum(p50s):.1f} ms (milliseconds, peak kb is what one search allocates)')
+
+    if resource is not None:
+        maxrss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        maxrss_mb: float = maxrss / 1024 / 1024 if sys.platform in ['darwin'] else maxrss / 1024
+        print(f'process peak rss {maxrss_mb:.0f} mb')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='search_cards benchmark on a synthetic database')
+    parser.add_argument('--scale', type=float, default=1.0, help='1 is about the size of todays MTG, try 5 or 20')
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--engine', choices=['columns', 'python'], default='columns')
+    parser.add_argument('--cached', action='store_true', help='let the search cache answer repeated queries')
+    parser.add_argument('--dir', default='', help='where the synthetic databases goes, reused when they exist')
+    args = parser.parse_args()
+
+    directory: str = args.dir or f'{tempfile.gettempdir()}{os.sep}tinytiny_bench_{args.scale:g}x'
+    prepare(directory, args.scale, reuse=bool(args.dir) or os.path.exists(directory))
+
+    from useful.database import MTGData
+    timer_start: float = time.perf_counter()
+    MTGData.load()
+    load_s: float = time.perf_counter() - timer_start
+    prepare_owned(directory)
+    print(f'database loaded in {load_s:.2f} seconds, engine {args.engine}, {args.repeat} repeats per query')
+    print(f'parser agrees on {len(PARSES)} separator joined queries') if check_parses() else ...
+
+    print_reports(run(args.repeat, args.engine, args.cached))
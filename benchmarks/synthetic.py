@@ -0,0 +1,163 @@
+import os, random, sqlite3, sys, time, uuid
+
+sys.path.insert(0, os.sep.join(__file__.split(os.sep)[:-2]))
+from useful.update_database import CARD_COLUMNS, SET_COLUMNS, optimize_database
+
+MTG_NAMES: int = 28_000
+MTG_SETS: int = 700
+
+FORMATS: list[str] = ['alchemy', 'brawl', 'commander', 'duel', 'explorer', 'future', 'gladiator', 'historic', 'legacy',
+                      'modern', 'oathbreaker', 'oldschool', 'pauper', 'penny', 'pioneer', 'premodern', 'standard',
+                      'timeless', 'vintage']
+
+WORDS: list[str] = ('angel dragon goblin elf wizard knight serpent sphinx demon spirit horror zombie vampire beast giant '
+                    'storm fire ice shadow light blood bone iron stone wind sky sea moon sun ancient twisted feral noble '
+                    'grim silent eternal forgotten lost hidden burning frozen wild savage arcane').split()
+
+TEXTS: list[str] = ['Flying', 'Draw a card.', 'When this enters, draw a card.', 'Deathtouch', 'Trample', 'Haste',
+                    'Destroy target creature.', 'Counter target spell.', 'Add {G}.', 'Target player discards a card.',
+                    'Scry 2.', 'Lifelink', 'Vigilance', 'Return target creature card from your graveyard to your hand.',
+                    '{T}: Add one mana of any color.', 'Create a 1/1 white Soldier creature token.', 'Menace', 'Reach']
+
+TYPES: list[str] = ['Creature', 'Instant', 'Sorcery', 'Artifact', 'Enchantment', 'Land', 'Planeswalker',
+                    'Artifact Creature', 'Enchantment Creature', 'Legendary Creature', 'Kindred Instant', 'Battle']
+
+SET_TYPES: list[str] = ['expansion'] * 6 + ['core'] * 2 + ['masters', 'draft_innovation', 'commander', 'alchemy']
+
+# a few real setcodes at their real release dates so README style queries (setcode=LRW, year<ORI) means something
+REAL_SETS: dict[str, str] = {'LRW': '2007-10-12', 'M10': '2009-07-17', 'ORI': '2015-07-17', 'DMU': '2022-09-09'}
+
+COLUMN_TYPES: dict[str, str] = dict(power='FLOAT', toughness='FLOAT', cmc='INTEGER', releasedate_epoch='INTEGER')
+
+
+def make_sets(rnd: random.Random, amount: int) -> list[dict]:
+    first: int = int(time.mktime((1993, 8, 5, 0, 0, 0, 0, 0, 0)))
+    last: int = int(time.mktime((2025, 11, 14, 0, 0, 0, 0, 0, 0)))
+    epochs: list[int] = sorted(rnd.randint(first, last) for _ in range(amount))
+
+    sets: list[dict] = []
+    setcodes: set[str] = set(REAL_SETS)
+    for epoch in epochs:
+        while True:
+            setcode: str = rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') + ''.join(rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(rnd.choice([2, 2, 2, 3])))
+            if setcode not in setcodes:
+                setcodes.add(setcode)
+                break
+
+        name: str = ' '.join(rnd.choice(WORDS) for _ in range(2)).title() + f' {len(sets)}'
+        sets.append(dict(name=name, releasedate_epoch=epoch, releasedate_string=time.strftime('%Y-%m-%d', time.localtime(epoch)), setcode=setcode, type=rnd.choice(SET_TYPES)))
+
+    for setcode, date in REAL_SETS.items():
+        epoch: int = int(time.mktime(time.strptime(date, '%Y-%m-%d')))
+        sets.append(dict(name=f'{setcode.title()} Real', releasedate_epoch=epoch, releasedate_string=date, setcode=setcode, type='expansion'))
+
+    return sets
+
+def make_cards(rnd: random.Random, amount: int, sets: list[dict]) -> tuple[list[dict], list[tuple]]:
+    artists: list[str] = [f'{rnd.choice(WORDS).title()} {rnd.choice(WORDS).title()}{n}' for n in range(1500)]
+    colors: list[str] = ['W', 'U', 'B', 'R', 'G']
+    cards: list[dict] = []
+    legalities: list[tuple] = []
+    for n in range(amount):
+        name: str = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 3))).title() + f' {n}'
+        card_type: str = rnd.choice(TYPES)
+        creature: bool = 'Creature' in card_type
+        if creature:
+            card_type += ' — ' + ' '.join(rnd.sample(WORDS[:14], rnd.randint(1, 2))).title()
+        card_colors: list[str] = rnd.sample(colors, rnd.choice([0, 1, 1, 1, 2, 3]))
+        cmc: int = rnd.randint(0, 9)
+        generic: str = '{%d}' % (cmc - len(card_colors)) if cmc > len(card_colors) else ''
+        layout: str = rnd.choice(['normal'] * 20 + ['transform', 'split', 'adventure'])
+        face: dict = dict(
+            name=name,
+            type=card_type,
+            types=card_type.split(' — ')[0].split()[-1],
+            text=' '.join(rnd.sample(TEXTS, rnd.randint(1, 3))),
+            power=float(rnd.randint(0, 8)) if creature else None,
+            toughness=float(rnd.randint(1, 8)) if creature else None,
+            cmc=cmc,
+            mana_cost=''.join('{%s}' % x for x in card_colors) + generic,
+            keywords=','.join(rnd.sample(['Flying', 'Trample', 'Haste', 'Deathtouch'], rnd.randint(0, 2))) or None,
+            layout=layout,
+            loyalty=None,
+            colors=','.join(card_colors) or None,
+            color_identity=','.join(card_colors) or None,
+        )
+
+        # most names has a handful of printings, a few has dozens
+        for _ in range(min(40, int(rnd.expovariate(1 / 2.2)) + 1)):
+            printing: dict = dict(
+                face,
+                setcode=rnd.choice(sets)['setcode'],
+                scryfall_id=str(uuid.UUID(int=rnd.getrandbits(128))),
+                artist=rnd.choice(artists),
+                side='a' if layout != 'normal' else None,
+                frame_effects=rnd.choice([None] * 6 + ['legendary', 'legendary,inverted']),
+                number=str(rnd.randint(1, 400)) + rnd.choice([''] * 12 + ['a', '★']),
+                rarity=rnd.choice(['common'] * 4 + ['uncommon'] * 3 + ['rare'] * 2 + ['mythic']),
+            )
+            cards.append(printing)
+            if layout in ['transform']:
+                cards.append(dict(printing, side='b', name=f'{name} Reversed', mana_cost=None))
+
+        statuses: list[str] = ['Legal'] * 8 + ['Banned', 'Restricted']
+        csv: str = ','.join(f'{fmt}:{rnd.choice(statuses)}' for fmt in FORMATS if rnd.random() < 0.7)
+        if csv:
+            legalities.append((name, csv))
+
+    return cards, legalities
+
+def make_databases(directory: str, scale: float = 1.0, seed: int = 1) -> dict[str, str]:
+    """
+    quick_db.sqlite, legal_db.sqlite and setcode_prices.sqlite inside directory, same schema as make_quick_db,
+    make_quick_legal_db and make_prices_db writes. scale 1 is about the size of todays MTG
+    """
+    rnd = random.Random(seed)
+    print(f'generating {scale}x synthetic databases into {directory}', end='', flush=True)
+    timer_start: float = time.time()
+
+    sets: list[dict] = make_sets(rnd, int(MTG_SETS * scale))
+    cards, legalities = make_cards(rnd, int(MTG_NAMES * scale), sets)
+
+    os.makedirs(directory, exist_ok=True)
+    paths: dict[str, str] = {x: f'{directory}{os.sep}{x}.sqlite' for x in ['quick_db', 'legal_db', 'setcode_prices']}
+    [os.remove(path) for path in paths.values() if os.path.exists(path)]
+
+    card_cols: list[str] = sorted(list(CARD_COLUMNS))
+    set_cols: list[str] = sorted(list(SET_COLUMNS))
+    connection = sqlite3.connect(paths['quick_db'])
+    with connection:
+        name_type: list[str] = [f'{x} {COLUMN_TYPES.get(x, "TEXT")}' for x in card_cols]
+        connection.execute(f'create table cards ({",".join(name_type)})')
+        name_type: list[str] = [f'{x} {COLUMN_TYPES.get(x, "TEXT")}' for x in set_cols]
+        connection.execute(f'create table sets ({",".join(name_type)})')
+        connection.executemany(f'insert into cards values({",".join(["?"] * len(card_cols))})', [tuple(x[col] for col in card_cols) for x in cards])
+        connection.executemany(f'insert into sets values({",".join(["?"] * len(set_cols))})', [tuple(x[col] for col in set_cols) for x in sets])
+    connection.close()
+
+    connection = sqlite3.connect(paths['legal_db'])
+    with connection:
+        connection.execute('create table legalities (name TEXT, csv_status TEXT)')
+        connection.executemany('insert into legalities values(?,?)', legalities)
+    connection.close()
+
+    connection = sqlite3.connect(paths['setcode_prices'])
+    with connection:
+        rows: list[tuple] = []
+        for card in cards:
+            if card['side'] in [None, 'a'] and rnd.random() < 0.8:
+                rows.append((card['scryfall_id'], round(rnd.random() * 10, 2), round(rnd.random() * 20, 2)))
+
+        connection.execute('create table prices (scryfall_id TEXT, regular FLOAT, foil FLOAT)')
+        connection.executemany('insert into prices values(?,?,?)', rows)
+    connection.close()
+
+    timer_end: float = time.time() - timer_start
+    print(f' \33[33:1:15m{len(cards)}\33[0m printings ({round(timer_end, 2)} sec)', flush=True)
+
+    [optimize_database(path) for path in paths.values()]
+    return paths
+
+
+if __name__ == '__main__':
+    make_databases(sys.argv[1], scale=float(sys.argv[2]) if len(sys.argv) > 2 else 1.0)
@@ -1,13 +1,15 @@
 from useful.preloads import preloads
 
 hack_strings: list[str] = []
-# hack_strings: list[str] = ['update_database', 'import_owned', 'zip_source', 'update_legals', 'import_prices']
+# hack_strings: list[str] = ['update_database', 'import_owned', 'zip_source', 'update_legals', 'import_prices', 'import_image_uris', 'optimize_databases', 'verify_database', 'prefetch_images', 'setcode==LRW']
 hack_string: str = ' '.join(hack_strings)
 preloads(hack_string)
 
+from useful.database import MTGData
+MTGData.preload()
+
 from PyQt6             import QtCore, QtGui, QtWidgets
 from cardgeo.cardgeo   import CardGeo
-from copy              import deepcopy
 from ui.deckboxes      import DeckBoxes
 from ui.searchbox      import SearchBox
 from ui.spotlight      import SpotLight
@@ -17,32 +19,95 @@ import pickle, sys, sqlite3
 
 
 class Settings(dict):
+    """
+    one row per setting, dict settings (deckboxes) one row per item. save_setting just marks the key dirty, or
+    only (key, item) when given an item so saving a deck pickles and writes that deck alone. the dirty rows are
+    written in one transaction FLUSH_DELAY_MS after the last save and when the app quits
+    """
+    FLUSH_DELAY_MS: int = 750
     storage: dict = {}
+    written: dict[str, dict[bytes, int]] = {}  # key -> {pickled item: position} of the rows in the table
+    dirty: set[str] = set()
+    dirty_items: set[tuple] = set()
     connection = sqlite3.connect(user_datas)
     cursor = connection.cursor()
-    try:
-        q: str = 'select data from settings where id is 1'
-        data: tuple | None = cursor.execute(q).fetchone()
-        storage: dict = pickle.loads(data[0])
-    except TypeError:
-        ...
-    except sqlite3.OperationalError:
-        with connection:
-            q: str = 'CREATE TABLE if not exists settings (id INTEGER PRIMARY KEY AUTOINCREMENT, data BLOB)'
-            cursor.execute(q)
-            q: str = 'insert into settings values(?,?)'
-            v: tuple = None, None,
-            cursor.execute(q, v)
+    with connection:
+        q: str = 'CREATE TABLE if not exists setting_rows (key TEXT, item BLOB, position INTEGER, data BLOB, PRIMARY KEY (key, item))'
+        cursor.execute(q)
+
+    q: str = 'select key, item, position, data from setting_rows order by key, position'
+    rows: list[tuple] = cursor.execute(q).fetchall()
+    for key, item, position, data in rows:
+        written.setdefault(key, {})[item] = position
+        if not item:
+            storage[key] = pickle.loads(data)
+        else:
+            storage.setdefault(key, {})[pickle.loads(item)] = pickle.loads(data)
+
+    # everything used to be one pickled dict in settings, moved over the first time
+    if not rows:
+        try:
+            q: str = 'select data from settings where id is 1'
+            data: tuple | None = cursor.execute(q).fetchone()
+            storage: dict = pickle.loads(data[0])
+            dirty: set[str] = set(storage)
+        except (TypeError, sqlite3.OperationalError):
+            ...
+
+    def __init__(self):
+        super().__init__()
+        self.flush_timer = QtCore.QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush() if self.dirty else ...
 
     def load_setting(self, key):
         return self.storage.get(key, None)
 
-    def save_setting(self, key, value) -> None:
-        self.storage[key] = deepcopy(value)
-        with self.connection:
-            q: str = 'update settings set data = (?) where id is 1'
-            v: tuple = pickle.dumps(self.storage),
-            self.cursor.execute(q, v)
+    def save_setting(self, key, value, item=None) -> None:
+        self.storage[key] = value
+        self.dirty.add(key) if item is None else self.dirty_items.add((key, item))
+        self.flush_timer.start(self.FLUSH_DELAY_MS)
+
+    def flush(self):
+        upserts: list[tuple] = []
+        deletes: list[tuple] = []
+        for key in self.dirty:
+            value = self.storage.get(key, None)
+            if type(value) is dict and value:
+                rows: dict = {pickle.dumps(k): (n, pickle.dumps(v)) for n, (k, v) in enumerate(value.items())}
+            else:
+                rows: dict = {b'': (0, pickle.dumps(value))}
+
+            upserts += [(key, item, position, data) for item, (position, data) in rows.items()]
+            deletes += [(key, item) for item in self.written.get(key, {}) if item not in rows]
+            self.written[key] = {item: position for item, (position, _) in rows.items()}
+
+        for key, item in self.dirty_items:
+            if key in self.dirty:
+                continue
+
+            value = self.storage.get(key, None)
+            positions: dict[bytes, int] = self.written.setdefault(key, {})
+            pickled_item: bytes = pickle.dumps(item)
+            if type(value) is dict and item in value:
+                position: int = positions.get(pickled_item, max(positions.values(), default=-1) + 1)
+                upserts.append((key, pickled_item, position, pickle.dumps(value[item])))
+                positions[pickled_item] = position
+                if b'' in positions:  # was stored whole while empty
+                    positions.pop(b'')
+                    deletes.append((key, b''))
+
+            elif pickled_item in positions:
+                positions.pop(pickled_item)
+                deletes.append((key, pickled_item))
+
+        self.dirty.clear()
+        self.dirty_items.clear()
+        if upserts or deletes:
+            with self.connection:
+                self.cursor.executemany('insert or replace into setting_rows values(?,?,?,?)', upserts)
+                self.cursor.executemany('delete from setting_rows where key is (?) and item is (?)', deletes)
 
 class TinyBuilder(QtWidgets.QMainWindow):
 
@@ -77,8 +142,8 @@ class TinyBuilder(QtWidgets.QMainWindow):
     def load_setting(self, key):
         return self.settings_handler.load_setting(key)
 
-    def save_setting(self, key, value):
-        self.settings_handler.save_setting(key, value)
+    def save_setting(self, key, value, item=None):
+        self.settings_handler.save_setting(key, value, item=item)
 
 
 
@@ -98,4 +163,5 @@ if '__main__' in __name__:
         geometry: tuple[int, int, int, int] = 100, 100, 1000, 1000,
 
     program = TinyBuilder(geometry)
+    app.aboutToQuit.connect(program.settings_handler.flush)
     app.exec()
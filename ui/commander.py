@@ -5,8 +5,9 @@ from PyQt6            import QtCore, QtGui, QtWidgets
 from cardgeo.cardgeo  import CardGeo
 from ui.basics        import Label, MoveLabel, ResizeLabel, ShadeLabel
 from useful.breakdown import search_cards, tweak_query
-from useful.database  import Card, MTGData, Set
+from useful.database  import Card, MTGData, Set, get_card
 from useful.images    import CardImageLocation
+from useful.thumbnails import Thumbnails
 from useful.tech      import add_rgb, shrinking_rect, sub
 import os, time
 
@@ -85,67 +86,11 @@ class ImageLabel(Label):
                 self.img_loc.download_image(finished_fn=self.download_finished)
 
     def download_finished(self, successful: bool):
-        if successful:
-            self.smart_croped_image() or self.fallback_image()
-
-    def fallback_image(self) -> bool | None:
-        size: tuple = self.width(), self.height(),
-        try:
-            im = Image.open(self.img_loc.full_path)
-            chop_w: int = im.width // 75
-            chop_h: int = im.height // 75
-            crop_args = chop_w, chop_h, (im.width - 1) - chop_w, (im.height - 1) - chop_h
-            im = im.crop(crop_args)
-            qim = ImageQt(im)
-            pixmap = QtGui.QPixmap.fromImage(qim).scaled(*size, transformMode=QtCore.Qt.TransformationMode(1))
-        except:
-            ...
-        else:
-            self.setPixmap(pixmap)
-            if not self.hasScaledContents():
-                self.setScaledContents(True)
-            return True
-
-    def smart_croped_image(self) -> bool | None:
-        size: tuple = self.width(), self.height(),
-        try:
-            large_im = Image.open(self.img_loc.full_path)
-            small_im = large_im.resize(size, resample=Image.Resampling.NEAREST)
-            datas = small_im.getdata()
-
-            yx: dict[int, int] = {(small_im.height // 6) * n: -1 for n in range(1, 6)}
-            w: int = small_im.width
-            for y in yx:
-                row_ix: int = y * w
-                vals: list = [sum(datas[row_ix + x]) for x in range(1, 4)]
-                val: int = sum(vals) // len(vals)
-                min_val: int = max(0, min(val // 2, val - 30))
-                max_val: int = min(int(val * 1.5), 255 * 3)
-
-                for x in range(w // 75, w // 10):
-                    ix: int = row_ix + x
-                    val: int = sum(datas[ix])
-                    if val >= max_val or val <= min_val:
-                        yx[y]: int = x - 1
-                        break
-
-            vals: list[int] = sorted(v for _, v in yx.items() if v > 0)
-            val: int = sum(vals[1:-1]) // len(vals) - 2
-            factor: float = large_im.width / small_im.width
-            val: int = int(val * factor)
-            chop_w: int = val
-            chop_h: int = val
-            crop_args = chop_w, chop_h, (large_im.width - 1) - chop_w, (large_im.height - 1) - chop_h
-            im = large_im.crop(crop_args)
-            qim = ImageQt(im)
-            pixmap = QtGui.QPixmap.fromImage(qim).scaled(*size, transformMode=QtCore.Qt.TransformationMode(1))
-        except:
-            ...
-        else:
+        pixmap = Thumbnails.pixmap(self.img_loc.full_path, self.width(), self.height()) if successful else None
+        if pixmap:
             self.setPixmap(pixmap)
             if not self.hasScaledContents():
                 self.setScaledContents(True)
-            return True
 
 class ImageBackGround(Label):
     def resizeEvent(self, *args):
@@ -200,9 +145,7 @@ class Commander(ResizeLabel):
         cmd_data: dict[str, int] | None = self.deck.get('commander', None)
         if cmd_data:
             scryfall_id: str = next(iter(cmd_data))
-            q: str = 'select * from cards where scryfall_id is (?) and (side is "a" or side is null)'
-            v: tuple = scryfall_id,
-            self.card_data: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+            self.card_data: tuple | None = get_card(scryfall_id)
         else:
             self.card_data: tuple | None = None
 
@@ -266,8 +209,6 @@ class Commander(ResizeLabel):
 
 
     def insert_card_into_box(self, scryfall_id: str):
-        q: str = 'select * from cards where scryfall_id is (?) and (side is "a" or side is null)'
-        v: tuple = scryfall_id,
-        self.card_data: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+        self.card_data: tuple | None = get_card(scryfall_id)
         self.deckbox.insert_card_into_box(scryfall_id, slot='commander')
         self.show_commander()
@@ -4,8 +4,9 @@ from PIL.ImageQt      import ImageQt
 from PyQt6            import QtCore, QtGui, QtWidgets
 from cardgeo.cardgeo  import CardGeo
 from ui.basics        import Label, MoveLabel, ShadeLabel
-from useful.breakdown import search_cards, tweak_query
+from useful.breakdown import search_cards, tweak_smartvals
 from useful.tech      import add, add_rgb, shrinking_rect, sub, sub_rgb
+from useful.threadpool import LatestOnly
 
 
 class SearchBar(Label):
@@ -22,15 +23,29 @@ class SearchBar(Label):
         self.lineedit.setContentsMargins(5, 0, 5, 0)
         self.lineedit.setText(self.main.load_setting(self.settings_var) or '')
         self.lineedit.returnPressed.connect(self.return_pressed)
+        self.searcher = LatestOnly(lambda text: search_cards(text=tweak_smartvals(text)))
+        self.searcher.finished.connect(self.search_finished)
+
+    def set_busy(self, busy: bool):
+        queue_status = self.searchbox.databar.queue_status if self.searchbox.databar else None
+        queue_status.set_busy(busy) if queue_status else ...
 
     def return_pressed(self):
         text: str = self.lineedit.text().strip()
         self.main.save_setting(self.settings_var, text)
         if not text:
+            self.searcher.cancel()
+            self.set_busy(False)
+            return
+
+        self.set_busy(True)
+        self.searcher.submit(text)
+
+    def search_finished(self, generation: int, queue: list | None):
+        if not self.searcher.is_current(generation):
             return
 
-        tweaked_text: str = tweak_query(text)
-        queue: list = search_cards(text=tweaked_text)
+        self.set_busy(False)
         if not queue:
             return
 
@@ -237,6 +252,7 @@ class MoreBTN(Label):
 
 class QueueStatus(Label):
     min_w: int = 100
+    busy: bool = False
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         self.background = Label(self)
@@ -263,10 +279,18 @@ class QueueStatus(Label):
         pixmap = QtGui.QPixmap.fromImage(qim)
         self.background.setPixmap(pixmap)
 
+    def set_busy(self, busy: bool):
+        self.busy = busy
+        self.update_status()
+
     def update_status(self):
         queue: list = self.master.master.cards
         total: int = len(queue)
-        if not total:
+        if self.busy:
+            self.textlabel.setText('SEARCHING...')
+            text_w: int = self.textlabel.get_text_width() + 20
+            self.resize(max(text_w, self.min_w), self.height())
+        elif not total:
             self.textlabel.setText('...')
         else:
             shown: int = sum(1 if card['showcase'] else 0 for card in queue)
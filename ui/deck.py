@@ -11,7 +11,7 @@ from ui.deckdetails       import DeckDetails, DeckDetailsBTN
 from ui.import_and_export import ImportExport, ImportExportBTN
 from ui.showbox           import ShowBox
 from ui.showcase          import ShowCase
-from useful.database      import Card, MTGData, Set
+from useful.database      import Card, MTGData, Set, get_card
 from useful.tech          import add, add_rgb, add_rgba, shrinking_rect, sub
 import time
 
@@ -313,7 +313,7 @@ class Deck(ShowBox):
         deckboxes: dict = self.main.load_setting('deckboxes') or {}
         if deckboxes.get(uuid, None) != self.deck:
             deckboxes[uuid]: dict = deepcopy(self.deck)
-            self.main.save_setting('deckboxes', deckboxes)
+            self.main.save_setting('deckboxes', deckboxes, item=uuid)
 
     def new_showcase(self, box: dict) -> ShowCase:
         kwgs = dict(card_data=box['card'], bag=box['bag'], amount=box['amount'], slot=box['slot'])
@@ -340,9 +340,7 @@ class Deck(ShowBox):
                     self.commander.show_commander()
 
     def insert_card_into_deck(self, scryfall_id: str, slot: str = 'maindeck', amount: int = 1):
-        q: str = 'select * from cards where scryfall_id is (?) and (side is "a" or side is null)'
-        v: tuple = scryfall_id,
-        card_data: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+        card_data: tuple | None = get_card(scryfall_id)
         if not card_data:
             return
 
@@ -393,17 +391,13 @@ class Deck(ShowBox):
                 scry_ids.add(scryfall_id)
                 queue.append(box)
 
-        marks: list = ['?'] * len(scry_ids)
-        q: str = f'select * from cards where scryfall_id in ({",".join(marks)}) and (side is "a" or side is null)'
-        cards: list = MTGData.cursor.execute(q, list(scry_ids)).fetchall()
-        for n in range(len(queue) - 1, -1, -1):
-            box: dict = queue[n]
-            for card in cards:
-                if card[Card.scryfall_id] == box['scryfall_id']:
-                    name: str = card[Card.name]
-                    box['card'] = card
-                    box['name'] = name
-                    box['bag'] = MTGData.NAME_BAG[name]
+        for box in queue:
+            card: tuple | None = get_card(box['scryfall_id'])
+            if card:
+                name: str = card[Card.name]
+                box['card'] = card
+                box['name'] = name
+                box['bag'] = MTGData.NAME_BAG[name]
 
         return [box for box in queue if box['card'] and box['bag']]
 
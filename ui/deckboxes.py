@@ -108,7 +108,7 @@ class DelBTN(DeckButton):
                 deckboxes: dict = self.main.load_setting('deckboxes') or {}
                 if uuid in deckboxes:
                     deckboxes.pop(uuid)
-                    self.main.save_setting('deckboxes', deckboxes)
+                    self.main.save_setting('deckboxes', deckboxes, item=uuid)
 
                 self.master.master.deckboxes.remove(self.master)
                 self.master.master.redraw_deckboxes()
@@ -226,7 +226,7 @@ class DeckBox(Label):
         uuid: str = self.deckbox['uuid']
         deckboxes: dict = self.main.load_setting('deckboxes') or {}
         deckboxes[uuid]: dict = self.deckbox
-        self.main.save_setting('deckboxes', deckboxes)
+        self.main.save_setting('deckboxes', deckboxes, item=uuid)
 
         self._lineedit.setText(text)
 
@@ -325,7 +325,7 @@ class DeckBoxesMenu(Label):
         uuid: float = new_deck['uuid']
         deckboxes: dict = self.main.load_setting('deckboxes') or {}
         deckboxes[uuid]: dict = new_deck
-        self.main.save_setting('deckboxes', deckboxes)
+        self.main.save_setting('deckboxes', deckboxes, item=uuid)
         self.master.redraw_deckboxes()
         [x.show() for x in self.master.deckboxes]
 
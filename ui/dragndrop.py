@@ -1,10 +1,11 @@
 from PIL             import Image
 from PIL.ImageDraw   import ImageDraw
 from PIL.ImageQt     import ImageQt
-from PyQt6           import QtCore, QtGui
+from PyQt6           import QtGui
 from ui.basics       import Label, MoveLabel
 from useful.database import Card
 from useful.images   import CardImageLocation
+from useful.thumbnails import Thumbnails
 from useful.tech     import add, add_rgb, shrinking_rect, sub, sub_rgb
 
 class DragNDrop(MoveLabel):
@@ -39,16 +40,8 @@ class DragNDrop(MoveLabel):
         self.background.setPixmap(pixmap)
 
     def set_image(self):
-        size: tuple = self.image_label.width(), self.image_label.height(),
-        try:
-            im = Image.open(self.img_loc.full_path)
-            chop_w: int = im.width // 75
-            chop_h: int = im.height // 75
-            crop_args = chop_w, chop_h, (im.width - 1) - chop_w, (im.height - 1) - chop_h
-            im = im.crop(crop_args)
-            qim = ImageQt(im)
-            pixmap = QtGui.QPixmap.fromImage(qim).scaled(*size, transformMode=QtCore.Qt.TransformationMode(1))
-        except:
+        pixmap = Thumbnails.pixmap(self.img_loc.full_path, self.image_label.width(), self.image_label.height())
+        if not pixmap:
             self.image_label.setStyleSheet('background:black;color:transparent')
         else:
             self.image_label.clear()
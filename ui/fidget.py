@@ -3,7 +3,7 @@ from PIL.ImageDraw   import ImageDraw
 from PIL.ImageQt     import ImageQt
 from PyQt6           import QtCore, QtGui, QtWidgets
 from ui.basics       import Label
-from useful.database import Card, MTGData, Set
+from useful.database import Card, MTGData, Set, get_card
 from useful.symbols  import ManaSymbols
 from useful.tech     import add, add_rgb, shrinking_rect, sub, sub_rgb
 
@@ -43,9 +43,7 @@ class ManaBar(Label):
         if self.side_a is not None:
             # side_b is not fetched until requsted
             if self.side_b is None:
-                q: str = 'select * from cards where scryfall_id is (?) and side is "b"'
-                v: tuple = self.card_data[Card.scryfall_id],
-                self.side_b = MTGData.cursor.execute(q, v).fetchone()
+                self.side_b = get_card(self.card_data[Card.scryfall_id], side='b')
 
             self.show_symbols(self.side_b or self.side_a or self.card_data)
             self.master.position_textlabel_manabar()
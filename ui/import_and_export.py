@@ -8,8 +8,8 @@ from copy              import deepcopy
 from ui.basics         import Label, MoveLabel
 from ui.databar        import ActiveRevBTN, DataBar
 from useful.breakdown  import BoolKey, SmartKey, search_cards, smartkeys
-from useful.breakdown  import tweak_query
-from useful.database   import Card, MTGData, Owned, card_owned, name_owned
+from useful.breakdown  import SmartVal, tweak_smartvals
+from useful.database   import Card, MTGData, Owned, card_owned, get_card, get_faces, name_owned
 from useful.tech       import add, add_rgb, alter_stylesheet, shrinking_rect
 from useful.tech       import sub, sub_rgb
 from useful.threadpool import custom_thread
@@ -256,8 +256,7 @@ class FreeHand(TextInOutThingey):
                 return text
             else:
                 if 'scry_card' not in dir(self):
-                    q: str = 'select * from cards where side is "a" or side is null'
-                    self.scry_card: dict = {x[Card.scryfall_id]: x for x in MTGData.cursor.execute(q).fetchall()}
+                    self.scry_card: dict = MTGData.PRINTINGS
 
                 rows: list[str] = []
                 skipped = 0
@@ -329,11 +328,11 @@ class FreeHand(TextInOutThingey):
                         continue
 
                     for smks in [smartkeys, cust_smks]:
-                        tweaked_text: str = tweak_query(tmp_txt, custom_smartkeys=smks)
-                        queue: list = search_cards(tweaked_text, custom_smartkeys=smks)
+                        smvs: list[SmartVal] = tweak_smartvals(tmp_txt, custom_smartkeys=smks)
+                        queue: list = search_cards(smvs, custom_smartkeys=smks)
                         if queue:
                             queue.sort(key=lambda x: len(x['card'][Card.name])) # priorities name-search-matching
-                            fixed_setcode: bool = any(x in tweaked_text for x in ['setcode=', 'expansion='])
+                            fixed_setcode: bool = any(x.key in ['setcode', 'expansion'] and x.sep in ['=='] for x in smvs)
                             kwgs = dict(slot=slot, amount=amount, fixed_setcode=fixed_setcode)
                             item: DeckItem | None = deck_item(queue[0]['card'], **kwgs)
                             text = tmp_txt
@@ -674,10 +673,7 @@ class ImportExport(MoveLabel):
 
         missing: set[str] = {x['scryfall_id'] for x in tmp_items if x['scryfall_id'] not in self.prev_searches}
         if missing:
-            marks: str = ','.join(['?'] * len(missing))
-            q: str = f'select * from cards where scryfall_id in ({marks}) and (side is "a" or side is null)'
-            v: list[str] = list(missing)
-            [self.prev_searches.update({d[Card.scryfall_id]: d}) for d in MTGData.cursor.execute(q, v).fetchall()]
+            [self.prev_searches.update({d[Card.scryfall_id]: d}) for d in map(get_card, missing) if d]
 
         deck: list[DeckItem | None] = []
         for item in tmp_items:
@@ -747,11 +743,8 @@ class ImportExport(MoveLabel):
                 names.add(card_name)
 
         if names:
-            name_marks: str = ','.join(['?'] * len(names))
-            scry_marks: str = ','.join(['?'] * len(Owned.scryfall_ids))
-            q: str = f'select * from cards where name in ({name_marks}) and scryfall_id in ({scry_marks})'
-            v: tuple = tuple(names) + tuple(Owned.scryfall_ids)
-            name_carddata: dict[str, tuple] = {x[Card.name]: x for x in MTGData.cursor.execute(q, v).fetchall()}
+            faces: list[tuple] = [card for scry in Owned.scryfall_ids for card in get_faces(scry)]
+            name_carddata: dict[str, tuple] = {x[Card.name]: x for x in faces if x[Card.name] in names}
 
             for item in items_out:
                 if item is None:
@@ -9,7 +9,8 @@ from ui.basics         import Label, MoveLabel, ResizeLabel, Scroller
 from ui.databar        import DataBar, SearchBar
 from ui.showcase       import ShowCase
 from useful.breakdown  import SmartVal, search_cards, sort_cards, tweak_query
-from useful.database   import Card, Set
+from useful.database   import Card, Set, get_card
+from useful.images     import Downloads
 from useful.tech       import add, add_rgb, add_rgba, shrinking_rect, sub
 from useful.threadpool import custom_thread
 
@@ -78,6 +79,9 @@ class MoveCanvas(Label):
         px: int = self.offset
         self.master.setGeometry(0, px, self.scope_canvas.width(), self.scope_canvas.height() - (px * 2))
 
+    def moveEvent(self, a0):
+        self.showbox.prioritize_downloads()
+
 
 class ShowBox(ResizeLabel):
     min_w: int = 1024
@@ -229,12 +233,10 @@ class ShowBox(ResizeLabel):
                 return self._add_queue([box])
 
         elif isinstance(queue, str):
-            q: str = 'select * from cards where scryfall_id is (?) and (side is "a" or side is null)'
-            v: tuple = queue,
-            card_data: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+            card_data: tuple | None = get_card(queue)
             try:
                 bag = MTGData.NAME_BAG[card_data[Card.name]]
-            except (IndexError, KeyError, ValueError):
+            except (IndexError, KeyError, ValueError, TypeError):
                 return -1
             else:
                 box = dict(card=card_data, showcase=None, bag=bag, slot='maindeck', amount=1)
@@ -288,6 +290,32 @@ class ShowBox(ResizeLabel):
             showcase.move(x, y)
             positioned.append(showcase)
 
+    def download_priority(self, showcase: ShowCase) -> int | None:
+        """VISIBLE on screen, OFFSCREEN within a screen from it and None further away than that"""
+        top: int = -self.move_canvas.geometry().top()
+        h: int = self.scope_canvas.height()
+        geo = showcase.geometry()
+        if geo.bottom() >= top and geo.top() <= top + h:
+            return Downloads.VISIBLE
+        elif geo.bottom() >= top - h and geo.top() <= top + (h * 2):
+            return Downloads.OFFSCREEN
+
+    def prioritize_downloads(self):
+        """showcases still waiting for their image are moved in the download queue or dropped from it when scrolled away"""
+        for obj in self.cards:
+            showcase: ShowCase | None = obj['showcase']
+            img_loc = showcase.img_loc if showcase else None
+            if img_loc is None or img_loc.image_existed or img_loc.successful_download is not None:
+                continue
+
+            priority: int | None = self.download_priority(showcase)
+            if priority == img_loc.priority:
+                continue
+            elif priority is None:
+                img_loc.stop_download()
+            else:
+                img_loc.download_image(finished_fn=showcase.image_label.download_finished, priority=priority)
+
     def adjust_move_canvas_height(self):
         showcases: list[ShowCase] = [obj['showcase'] for obj in self.cards if obj['showcase']]
         w, h = self.move_canvas.width(), max(obj.geometry().bottom() for obj in showcases) if showcases else 0
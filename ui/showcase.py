@@ -1,13 +1,14 @@
 from PIL             import Image
 from PIL.ImageDraw   import ImageDraw
 from PIL.ImageQt     import ImageQt
-from PyQt6           import QtCore, QtGui, QtWidgets
+from PyQt6           import QtGui, QtWidgets
 from cardgeo.cardgeo import CardGeo
 from copy            import deepcopy
 from ui.basics       import Label, MoveLabel, ResizeLabel
 from ui.dragndrop    import DragNDrop
-from useful.database import Card, MTGData, Set
+from useful.database import Card, MTGData, Set, get_card
 from useful.images   import CardImageLocation
+from useful.thumbnails import Thumbnails
 from useful.tech     import add, shrinking_rect, sub
 
 
@@ -16,6 +17,9 @@ class CardImage(Label):
     def get_img_loc(self) -> CardImageLocation | None:
         return self.master.img_loc
 
+    def download_priority(self) -> int | None:
+        return self.master.showbox.download_priority(self.master)
+
     def download_finished(self, successful: bool):
         if successful:
             self.set_image()
@@ -24,68 +28,16 @@ class CardImage(Label):
         self.clear()
         img_loc = self.get_img_loc()
         if not img_loc:
-            if img_loc.successful_download is None:
-                img_loc.download_image(finished_fn=self.download_finished)
+            priority: int | None = self.download_priority()
+            if img_loc.successful_download is None and priority is not None:
+                img_loc.download_image(finished_fn=self.download_finished, priority=priority)
             return
 
-        self.smart_croped_image() or self.fallback_image()
-
-    def fallback_image(self) -> bool | None:
-        size: tuple = self.width(), self.height(),
-        img_loc = self.get_img_loc()
-        try:
-            im = Image.open(img_loc.full_path)
-            chop_w: int = im.width // 75
-            chop_h: int = im.height // 75
-            crop_args = chop_w, chop_h, (im.width - 1) - chop_w, (im.height - 1) - chop_h
-            im = im.crop(crop_args)
-            qim = ImageQt(im)
-            pixmap = QtGui.QPixmap.fromImage(qim).scaled(*size, transformMode=QtCore.Qt.TransformationMode(1))
-        except:
-            ...
-        else:
-            self.setPixmap(pixmap)
-            if not self.hasScaledContents():
-                self.setScaledContents(True)
-            return True
+        self.show_pixmap()
 
-    def smart_croped_image(self) -> bool | None:
-        size: tuple = self.width(), self.height(),
-        img_loc = self.get_img_loc()
-        try:
-            large_im = Image.open(img_loc.full_path)
-            small_im = large_im.resize(size, resample=Image.Resampling.NEAREST)
-            datas = small_im.getdata()
-
-            yx: dict[int, int] = {(small_im.height // 6) * n: -1 for n in range(1, 6)}
-            w: int = small_im.width
-            for y in yx:
-                row_ix: int = y * w
-                vals: list = [sum(datas[row_ix + x]) for x in range(1, 4)]
-                val: int = sum(vals) // len(vals)
-                min_val: int = max(0, min(val // 2, val - 30))
-                max_val: int = min(int(val * 1.5), 255 * 3)
-
-                for x in range(w // 75, w // 10):
-                    ix: int = row_ix + x
-                    val: int = sum(datas[ix])
-                    if val >= max_val or val <= min_val:
-                        yx[y]: int = x - 1
-                        break
-
-            vals: list[int] = sorted(v for _, v in yx.items() if v > 0)
-            val: int = sum(vals[1:-1]) // len(vals) - 2
-            factor: float = large_im.width / small_im.width
-            val: int = int(val * factor)
-            chop_w: int = val
-            chop_h: int = val
-            crop_args = chop_w, chop_h, (large_im.width - 1) - chop_w, (large_im.height - 1) - chop_h
-            im = large_im.crop(crop_args)
-            qim = ImageQt(im)
-            pixmap = QtGui.QPixmap.fromImage(qim).scaled(*size, transformMode=QtCore.Qt.TransformationMode(1))
-        except:
-            ...
-        else:
+    def show_pixmap(self) -> bool | None:
+        pixmap = Thumbnails.pixmap(self.get_img_loc().full_path, self.width(), self.height())
+        if pixmap:
             self.setPixmap(pixmap)
             if not self.hasScaledContents():
                 self.setScaledContents(True)
@@ -120,9 +72,7 @@ class ShowCase(MoveLabel):
             self.grabbed_at = self.geometry().left(), self.geometry().top()
             double_sided: bool = self.card_data[Card.layout] in ['transform', 'modal_dfc', 'meld']
             if double_sided and self.card_data[Card.side] == 'a':
-                q: str = 'select * from cards where side is "b" and scryfall_id is (?)'
-                v: tuple = self.card_data[Card.scryfall_id],
-                other_side: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+                other_side: tuple | None = get_card(self.card_data[Card.scryfall_id], side='b')
                 if other_side:
                     self.img_loc.stop_download()
                     self.img_loc: CardImageLocation = CardImageLocation(other_side)
@@ -6,10 +6,10 @@ from cardgeo.cardgeo import CardGeo
 from ui.basics import Label, MoveLabel, ResizeLabel, ShadeLabel, ActiveRevBTN,GroupBTN
 from ui.showcase     import CardImage
 from useful.database import Card, MTGData, Set,Owned,get_prices,get_regular_price,get_foil_price
-from useful.images   import CardImageLocation
+from useful.images   import CardImageLocation, Downloads
 from useful.tech     import add, add_rgb, shrinking_rect, sub, sub_rgb
 import os
-from useful.database import MTGData,card_owned,name_owned
+from useful.database import MTGData,card_owned,name_owned,get_card
 
 class OwnBTN(GroupBTN):
     font_size: int = 12
@@ -70,20 +70,18 @@ class AddDelOwned(OwnBTN):
         if self.spotlight.card_data is not None:
             card_data = self.spotlight.card_data
             if 'ADD' in self.modes[self.mode]:
-                Owned.add_to_textfile(card_data)
+                Owned.add_card(card_data)
             elif self.remove_card:
-                Owned.remove_from_textfile(card_data)
+                Owned.remove_card(card_data)
             elif self.remove_name:
-                cardname: str = card_data[Card.name]
-                q: str = 'select * from cards where name is (?)'
-                v: tuple = cardname,
-                cards: list = MTGData.cursor.execute(q, v).fetchall()
+                # bags are keyed on the a side, a b side shares its scryfall_ids
+                cardname: str = (get_card(card_data[Card.scryfall_id]) or card_data)[Card.name]
+                bag = MTGData.NAME_BAG.get(cardname)
+                cards: list = bag.cards if bag else []
                 owned_scry: set[str] = Owned.get_owned()
                 diffs: set = {x for x in cards if x[Card.scryfall_id] in owned_scry}
                 if diffs:
-                    [Owned.remove_from_textfile(x, save=False) for x in diffs]
-                    Owned.all_names.remove(cardname) if cardname in Owned.all_names else ...
-                    Owned.save_state_to_file()
+                    [Owned.remove_card(x) for x in diffs]
 
             self.spotlight.owned_status_btn.show_status()
             self.spotlight.owned_handle_btn.show_status()
@@ -286,6 +284,9 @@ class SpotLightCardImage(CardImage):
     def get_img_loc(self) -> CardImageLocation | None:
         return self.master.master.img_loc
 
+    def download_priority(self) -> int | None:
+        return Downloads.SPOTLIGHT
+
     def mouseReleaseEvent(self, ev):
         if ev.button().value != 1:
             self.master.master.clear_spotlight()
@@ -293,9 +294,7 @@ class SpotLightCardImage(CardImage):
             card_data: tuple | None = self.master.master.card_data
             double_sided: bool = card_data and card_data[Card.layout] in ['transform', 'modal_dfc', 'meld']
             if double_sided and card_data[Card.side] == 'b':
-                q: str = 'select * from cards where side is "a" and scryfall_id is (?)'
-                v: tuple = card_data[Card.scryfall_id],
-                a_side: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+                a_side: tuple | None = get_card(card_data[Card.scryfall_id], side='a')
                 if a_side and a_side != card_data:
                     self.master.master.borrow_spotlight(a_side)
 
@@ -305,9 +304,7 @@ class SpotLightCardImage(CardImage):
         card_data: tuple | None = self.master.master.card_data
         double_sided: bool = card_data and card_data[Card.layout] in ['transform', 'modal_dfc', 'meld']
         if double_sided and card_data[Card.side] == 'a':
-            q: str = 'select * from cards where side is "b" and scryfall_id is (?)'
-            v: tuple = card_data[Card.scryfall_id],
-            b_side: tuple | None = MTGData.cursor.execute(q, v).fetchone()
+            b_side: tuple | None = get_card(card_data[Card.scryfall_id], side='b')
             if b_side and b_side != card_data:
                 self.master.master.borrow_spotlight(b_side)
 
@@ -374,9 +371,7 @@ class SpotLight(ResizeLabel):
         scryfall_id: str | None = settings.get('fixed', None)
         if scryfall_id:
             try:
-                q: str = 'select * from cards where scryfall_id is (?) and (side is "a" or side is null)'
-                v: tuple = scryfall_id,
-                card_data: tuple | None = MTGData.cursor.execute(q, v).fetchone() if scryfall_id else None
+                card_data: tuple | None = get_card(scryfall_id)
                 if card_data and os.path.exists(CardImageLocation(card_data).full_path):
                     self.fixed_spotlight(card_data)
             except:
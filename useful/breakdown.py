@@ -1,4 +1,10 @@
-from useful.database import MTGData,Owned,Card
+from useful.columns  import CardColumns
+from useful.database import Legalities,MTGData,Owned,Card
+from useful.setindex import SetIndex
+from useful.trigrams import CardTrigrams
+from array import array
+from collections import OrderedDict
+import operator, threading, time
 
 class SmartVal:
     def __init__(self, key: str, sep: str, val):
@@ -19,6 +25,13 @@ class SmartVal:
         args: tuple = self.key, self.sep, self.val
         return iter(args)
 
+    def __str__(self) -> str:
+        """back into query text, strings that wouldnt survive being parsed again are quoted"""
+        val = str(self.val).lower() if isinstance(self.val, bool) else self.val
+        if isinstance(val, str) and any(char in val for char in SmartArgs.sep_marks + '=!<>'):
+            val = f'"{val}"'
+        return f'{self.key}{self.sep}{val}'
+
 
 class SmartKey:
     trailing: bool = False
@@ -105,9 +118,18 @@ class IntKey(SmartKey):
                 if parts[0].isdigit() and parts[1].isdigit():
                     beg: int = min(int(parts[0]), int(parts[1]))
                     end: int = max(int(parts[0]), int(parts[1]))
-                    for val in range(beg, min(end, beg + limit) + 1):
-                        smv: SmartVal = SmartVal(key, sep, val=val)
-                        vals.append(smv)
+                    sep = '==' if sep in '=' else sep
+                    # a range is a pair of bounds, except != which still excludes each value
+                    if sep in ['==']:
+                        vals += [SmartVal(key, '>=', val=beg), SmartVal(key, '<=', val=end)]
+                    elif sep in ['>', '>=']:
+                        vals.append(SmartVal(key, sep, val=min(end, beg + limit)))
+                    elif sep in ['<', '<=']:
+                        vals.append(SmartVal(key, sep, val=beg))
+                    else:
+                        for val in range(beg, min(end, beg + limit) + 1):
+                            smv: SmartVal = SmartVal(key, sep, val=val)
+                            vals.append(smv)
 
         else:
             val = text.strip()
@@ -135,42 +157,35 @@ class StrKey(SmartKey):
         return vals
 
 class SmartArgs:
+    """
+    one pass over the query. the query is cut into chunks at spaces (quotations are kept whole) and a chunk that
+    begins with something reaching a smartkey begins a term: key, operator or the keys auto_sep, then one or more
+    values separated by _,+ (trailing keys also takes space separated values). a value the key wont take ends the
+    term and may begin the next one (cmc=3,power>2), a term never reaches into the next chunk that begins with a key,
+    everything no term consumed goes to the default key
+    """
     results: list[SmartVal] = []
     sep_marks: str = ' _,+'
 
     def __init__(self, query: str, smartkeys: list[SmartKey], singleton: bool = True):
         self.query: str = query
+        self.masked: str = self.masked_quotations(query)
         self.singleton: bool = singleton
 
         self.smartkeys: list[SmartKey] = [smartkey for smartkey in smartkeys]
         self.smartkeys.sort(key=lambda x: x.key)
 
+        self.leftovers: list[tuple[int, int]] = []
         self.results: list[SmartVal] = self.extract_values()
-
-        for smk in self.smartkeys:
-            if smk.default and smk.auto_sep:
-                msk_query: str = self.masked_quotations(self.query)
-                parts: list[str] = ['']
-                for n, char in enumerate(msk_query):
-                    if char not in self.sep_marks:
-                        parts[-1] += self.query[n]
-
-                    elif parts[-1]:
-                        parts.append('')
-
-                parts = [f'{smk.key}{smk.auto_sep}{part}' for part in parts if part.strip()]
-                if parts:
-                    self.query = ' '.join(parts)
-                    self.results += self.extract_values()
-                    break
-
+        self.results += self.default_values()
         self.results = self.singleton_results(self.results) if singleton else self.results
 
     def __iter__(self):
         for smartval in self.results:
             yield smartval
 
-    def singleton_results(self, smartvals: list[SmartVal]) -> list[SmartVal]:
+    @staticmethod
+    def singleton_results(smartvals: list[SmartVal]) -> list[SmartVal]:
         singletons: list[SmartVal] = []
         breakdown: dict = {}
         for smartval in smartvals:
@@ -197,117 +212,137 @@ class SmartArgs:
 
         return singletons
 
-    def skip_fwd(self, text: str) -> int:
-        """returns how many chars in self.sepmarks from the left that needs to be skipped til relevant char appears"""
-        return len(text) - len(text.lstrip(self.sep_marks))
+    def skip_fwd(self, ix: int, wall: int | None = None) -> int:
+        """first index from ix thats not in self.sep_marks"""
+        wall = len(self.masked) if wall is None else wall
+        while ix < wall and self.masked[ix] in self.sep_marks:
+            ix += 1
+        return ix
+
+    def next_mark(self, ix: int, wall: int) -> int:
+        while ix < wall and self.masked[ix] not in self.sep_marks:
+            ix += 1
+        return ix
+
+    def chunk_starts(self) -> list[int]:
+        starts: list[int] = []
+        lft: int = self.skip_fwd(0)
+        while lft < len(self.masked):
+            starts.append(lft)
+            space: int = self.masked.find(' ', lft)
+            if space == -1:
+                break
+            lft = self.skip_fwd(space)
+        return starts
+
+    def key_matches(self, lft: int) -> list[tuple[SmartKey, int]]:
+        """every smartkey (in order) the chunk at lft reaches, together with where that key stops"""
+        space: int = self.masked.find(' ', lft)
+        chunk: str = self.masked[lft: len(self.masked) if space == -1 else space]
+        stops: dict[tuple, int] = {}
+        matches: list[tuple[SmartKey, int]] = []
+        for smk in self.smartkeys:
+            if smk.seps not in stops:
+                stops[smk.seps] = lft + smk.next_fwd_stop(chunk)
+
+            rgt: int = stops[smk.seps]
+            if smk.enough_key_reach(self.query[lft: rgt]):
+                matches.append((smk, rgt))
+        return matches
 
     def extract_values(self) -> list[SmartVal]:
         results: list[SmartVal] = []
-        poles: list[int] = self.get_poles()
-        always_space: set[int] = set()
-        lft: int = 0
-        while lft < len(self.query):
-            query: str = self.masked_quotations(self.query)
-            lft += self.skip_fwd(text=query[lft:])
-            rgt_poles: list[int] = [pole - 1 for pole in poles if pole - 1 > lft]
-            rgt_wall: int = min(rgt_poles) if rgt_poles else len(query)
-            for smk in self.smartkeys:
-
-                rgt: int = lft + smk.next_fwd_stop(query[lft: rgt_wall])
-                fuzzy_key: str = self.query[lft: rgt]
-                if not smk.enough_key_reach(fuzzy_key):
-                    continue
-
-                key_lft: int = lft
-                key_rgt: int = rgt
-
-                rgt += self.skip_fwd(text=query[rgt:])
-                sep: str | None = smk.get_next_sep(query[rgt: rgt_wall])
-                sep_present: bool = sep and query[rgt:].startswith(sep)
-                using_auto_sep: bool = sep and not sep_present
-
-                if sep_present:
-                    lft = (rgt + query[rgt:].find(sep) + len(sep))
-                elif using_auto_sep:
-                    lft = rgt if smk.trailing else key_lft
-                else:
-                    continue
-
-                lft += self.skip_fwd(text=query[lft:])
-                text: str = query[lft: rgt_wall]
-                if not text.lstrip(self.sep_marks):
-                    continue
-
-                if any(mark in text for mark in self.sep_marks):
-                    marks: list = [(mark, text.find(mark)) for mark in self.sep_marks if mark in text]
-                    marks.sort(key=lambda x: x[1])
-                    rgt_sep, rgt_ix = marks[0]
-                    text: str = self.query[lft: lft + rgt_ix]
-                    space_sep: bool = rgt_sep in ' '
-                    if not text.lstrip(self.sep_marks):
-                        continue
-                else:
-                    text: str = self.query[lft: rgt_wall]
-                    space_sep: bool = False
-
-                kwgs = dict(key=smk.key, sep=sep, text=text, auto_sep=using_auto_sep, limit=100)
-                smartvals: list[SmartVal] = smk.translate_values(**kwgs)
-                if not smartvals:
-                    continue
-
-                results += smartvals
-                if not space_sep or smk.trailing:
-                    [always_space.add(ix) for ix in range(key_lft, lft)]
-                    spaces: str = ' ' * len(query[lft: lft + len(text)])
-                    self.query = self.query[:lft] + spaces + self.query[lft + len(text):]
-                    lft = key_lft
-                    break
+        starts: list[int] = self.chunk_starts()
+        poles: list[tuple[int, list]] = [(lft, matches) for lft in starts if (matches := self.key_matches(lft))]
+        if not poles:
+            self.leftovers.append((0, len(self.query)))
+            return results
+
+        self.leftovers.append((0, poles[0][0]))
+        for n, (lft, matches) in enumerate(poles):
+            wall: int = poles[n + 1][0] - 1 if n + 1 < len(poles) else len(self.query)
+            while matches:
+                for smk, rgt in matches:
+                    smartvals, rgt = self.extract_term(smk, lft, rgt, wall)
+                    if smartvals:
+                        results += smartvals
+                        break
                 else:
-                    spaces: str = ' ' * len(query[key_lft: lft + len(text)])
-                    self.query = self.query[:key_lft] + spaces + self.query[lft + len(text):]
-                    lft = key_lft
                     break
 
-            else:
-                self.query = ''.join(char if ix not in always_space else ' ' for ix, char in enumerate(self.query))
-                lft = rgt_wall
+                lft = self.skip_fwd(rgt, wall)
+                matches = self.key_matches(lft) if lft < wall else []
+
+            self.leftovers.append((lft, wall))
 
         return results
 
+    def extract_term(self, smk: SmartKey, key_lft: int, key_rgt: int, wall: int) -> tuple[list[SmartVal], int]:
+        """the values smk gets from the term starting at key_lft and where the term ended, nothing if it failed"""
+        rgt: int = self.skip_fwd(key_rgt, wall)
+        sep: str | None = next((x for x in smk.seps if self.masked.startswith(x, rgt, wall)), None)
+        using_auto_sep: bool = sep is None and smk.auto_sep is not None
+        if sep:
+            lft: int = rgt + len(sep)
+        elif using_auto_sep:
+            sep = smk.auto_sep
+            lft: int = rgt if smk.trailing else key_lft
+        else:
+            return [], key_lft
+
+        results: list[SmartVal] = []
+        while True:
+            lft = self.skip_fwd(lft, wall)
+            if lft >= wall:
+                return results, wall
+
+            rgt = self.next_mark(lft, wall)
+            kwgs = dict(key=smk.key, sep=sep, text=self.query[lft: rgt], auto_sep=using_auto_sep, limit=100)
+            smartvals: list[SmartVal] = smk.translate_values(**kwgs)
+            if not smartvals:
+                return results, lft
+
+            results += smartvals
+            if rgt >= wall or (using_auto_sep and not smk.trailing):
+                return results, rgt
+
+            if self.masked[rgt] in ' ' and not smk.trailing:
+                return results, rgt
+
+            lft = rgt
+
+    def default_values(self) -> list[SmartVal]:
+        """whats left is split at every sep_mark and given to the first default key"""
+        for smk in self.smartkeys:
+            if smk.default and smk.auto_sep:
+                parts: list[str] = []
+                for lft, wall in self.leftovers:
+                    lft = self.skip_fwd(lft, wall)
+                    while lft < wall:
+                        rgt: int = self.next_mark(lft, wall)
+                        parts.append(self.query[lft: rgt])
+                        lft = self.skip_fwd(rgt, wall)
+
+                if parts:
+                    results: list[SmartVal] = []
+                    for part in parts:
+                        results += smk.translate_values(key=smk.key, sep=smk.auto_sep, text=part, limit=100)
+                    return results
+
+        return []
+
     def masked_quotations(self, text: str, maskchar: str = 'x') -> str:
-        while text.count('"') >= 2:
-            lft: int = text.find('"')
-            rgt: int = text[lft + 1:].find('"') + lft + 2
-            exs: str = maskchar * (rgt - lft)
-            text = text[:lft] + exs + text[rgt:]
-
-        return text
-
-
-    def get_poles(self) -> list[int]:
-        lft: int = 0
-        poles: list[int] = []
-        while lft < len(self.query):
-            query: str = self.masked_quotations(self.query)
-            lft += self.skip_fwd(text=query[lft:])
-
-            for smk in self.smartkeys:
-                rgt: int = lft + smk.next_fwd_stop(query[lft:])
-                fuzzy_key: str = self.query[lft: rgt]
-                if not smk.enough_key_reach(fuzzy_key):
-                    continue
-
-                poles.append(lft)
-                lft = rgt
+        chars: list[str] = list(text)
+        lft: int = text.find('"')
+        while lft != -1:
+            rgt: int = text.find('"', lft + 1)
+            if rgt == -1:
                 break
 
-            else:
-                if ' ' in query[lft:]:
-                    lft += query[lft:].find(' ')
-                else:
-                    break
+            chars[lft: rgt + 1] = maskchar * (rgt + 1 - lft)
+            lft = text.find('"', rgt + 1)
 
-        return poles
+        return ''.join(chars)
 
 smartkeys: list[SmartKey] = [
     IntKey(key='power', min_reach=1),
@@ -343,7 +378,8 @@ RARITIES: set[str] = {'mythic', 'rare', 'uncommon', 'common'}
 smartkeys += [BoolKey(mtg_type, min_reach=4, auto_sep='=') for mtg_type in MTG_TYPES]
 smartkeys += [BoolKey(rarity, min_reach=4, auto_sep='=') for rarity in RARITIES]
 
-def tweak_query(text: str, custom_smartkeys: list[SmartKey] | None = None) -> str:
+def tweak_smartvals(text: str, custom_smartkeys: list[SmartKey] | None = None) -> list[SmartVal]:
+    """the searchbar text parsed once, with the uppercase shorthands and color names expanded"""
     parts: list[str] = []
     for part in [part for part in text.split() if part]:
         if part in ['M']:
@@ -365,7 +401,7 @@ def tweak_query(text: str, custom_smartkeys: list[SmartKey] | None = None) -> st
 
     query: str =  ' '.join(parts).lower()
     smvs: list[SmartVal] = SmartArgs(query=query, smartkeys=custom_smartkeys or smartkeys).results
-    parts: list[str] = []
+    results: list[SmartVal] = []
     for smv in smvs:
         key, sep, val = smv
         if key == 'colors':
@@ -391,258 +427,381 @@ def tweak_query(text: str, custom_smartkeys: list[SmartKey] | None = None) -> st
                 selesnya='WG',
                 simic='UG'
             )
-            if val in races:
-                for col in list(races[val]):
-                    parts.append(f'{key}{sep}{col}')
-            else:
-                for col in list(val):
-                    parts.append(f'{key}{sep}{col}')
+            for col in list(races[val] if val in races else val):
+                results.append(SmartVal(key, sep, val=col.lower()))
         else:
-            parts.append(f'{key}{sep}{val}')
+            results.append(smv)
 
-    return ' '.join(parts).lower()
+    return SmartArgs.singleton_results(results)
 
+def tweak_query(text: str, custom_smartkeys: list[SmartKey] | None = None) -> str:
+    return ' '.join(str(smv) for smv in tweak_smartvals(text, custom_smartkeys=custom_smartkeys))
+
+
+OPERATORS: dict = {'==': operator.eq, '!=': operator.ne, '>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+class Predicate:
+    """
+    one SmartVal compiled into a closure. bag predicates are called with (bag_ix, bag) and judge the prefered
+    printing, printing predicates are called with a list of printings and return the ones that survived
+    """
+    def __init__(self, smv: SmartVal, fn, printing: bool = False, cost: int = 1, estimate: float = 1.0):
+        self.key, self.sep, self.val = smv
+        self.fn = fn
+        self.printing: bool = printing
+        self.cost: int = cost
+        self.estimate: float = estimate
+        self.checked: int = 0
+        self.passed: int = 0
+
+    def count(self):
+        fn = self.fn
+        if self.printing:
+            def counting(cards: list) -> list:
+                self.checked += 1
+                cards = fn(cards)
+                self.passed += 1 if cards else 0
+                return cards
+        else:
+            def counting(bag_ix: int, bag) -> bool:
+                self.checked += 1
+                good: bool = fn(bag_ix, bag)
+                self.passed += 1 if good else 0
+                return good
+
+        self.fn = counting
+
+    def describe(self) -> dict:
+        return dict(
+            key=self.key,
+            sep=self.sep,
+            val=self.val,
+            scope='printing' if self.printing else 'bag',
+            cost=self.cost,
+            estimate=round(self.estimate, 3),
+            checked=self.checked,
+            passed=self.passed,
+        )
+
+def compile_smartval(smv: SmartVal, owned: set[str]) -> Predicate | None:
+    key, sep, val = smv
+    if sep not in OPERATORS:
+        return None
+
+    op = OPERATORS[sep]
+    size: int = max(1, len(MTGData.NAME_BAG))
+    positive: bool = '!=' not in sep
+
+    if key in ['power', 'toughness', 'cmc']:
+        ix: int = getattr(Card, key)
+        val = int(val) if key in 'cmc' else float(val)
+        fn = lambda bag_ix, bag: not positive if bag.prefered[ix] is None else op(bag.prefered[ix], val)
+        return Predicate(smv, fn, cost=1)
+
+    elif key in ['number']:
+        ix: int = Card.number
+        if sep in ['==', '!=']:
+            str_val: str = str(val)
+            fn = lambda cards: [x for x in cards if op(x[ix], str_val)]
+        else:
+            fn = lambda cards: [x for x in cards if x[ix].isdigit() and op(int(x[ix]), val)]
+        return Predicate(smv, fn, printing=True, cost=1 if sep in ['==', '!='] else 2)
+
+    elif key in ['name', 'specbox', 'type']:
+        var: str = 'name' if key in 'name' else 'type'
+        ix: int = getattr(Card, var)
+        if sep in ['==', '!=']:
+            hits: set[int] = set(CardTrigrams.search(var, val))
+            fn = lambda bag_ix, bag: (bag_ix in hits) == positive
+            estimate: float = len(hits) / size if positive else 1.0 - (len(hits) / size)
+            return Predicate(smv, fn, cost=2, estimate=estimate)
+
+        fn = lambda bag_ix, bag: isinstance(bag.prefered[ix], str) and op(val, bag.prefered[ix].lower())
+        return Predicate(smv, fn, cost=4)
+
+    elif key in ['artist']:
+        ix: int = Card.artist
+        if sep in ['==', '!=']:
+            artists: set[str] = CardTrigrams.matching_artists(val)
+            fn = lambda cards: [x for x in cards if (x[ix] in artists) == positive]
+            return Predicate(smv, fn, printing=True, cost=2)
+
+        fn = lambda cards: [x for x in cards if x[ix] is not None and op(val, x[ix].lower())]
+        return Predicate(smv, fn, printing=True, cost=4)
+
+    elif key in MTG_TYPES:
+        ix: int = Card.types
+        fn = lambda cards: [x for x in cards if (key in x[ix].lower()) == bool(val)]
+        return Predicate(smv, fn, printing=True, cost=1)
+
+    elif key in ['textbox', 'keywords', 'colors', 'cost']:
+        positive: bool = sep in '=='
+        if key in ['textbox', 'keywords']:
+            hits: set[int] = set(CardTrigrams.search(key, val))
+            fn = lambda bag_ix, bag: (bag_ix in hits) == positive
+            estimate: float = len(hits) / size if positive else 1.0 - (len(hits) / size)
+            return Predicate(smv, fn, cost=3, estimate=estimate)
+
+        ix: int = Card.color_identity if key in ['colors'] else Card.mana_cost
+        def fn(bag_ix: int, bag) -> bool:
+            string = bag.prefered[ix]
+            if not isinstance(string, str):
+                return not positive
+            return (val in string.lower()) == positive
+
+        return Predicate(smv, fn, cost=4)
+
+    elif key in ['rarity'] or key in RARITIES:
+        ix: int = Card.rarity
+        positive: bool = bool((val and sep in '==') or (not val and sep in '!='))
+        if key in RARITIES:
+            fn = lambda cards: [x for x in cards if (key == x[ix]) == positive]
+        else:
+            fn = lambda cards: [x for x in cards if x[ix].startswith(val) == positive]
+        return Predicate(smv, fn, printing=True, cost=1)
+
+    elif key in ['owned']:
+        ix: int = Card.scryfall_id
+        fn = lambda cards: [x for x in cards if (x[ix] in owned) == bool(val)]
+        return Predicate(smv, fn, printing=True, cost=1)
+
+    elif key in ['legal', 'banned', 'restricted']:
+        positive: bool = sep in '=='
+        masks: array | list = Legalities.get_masks(key)
+        bits: int = Legalities.format_bits(val)
+        fn = lambda bag_ix, bag: bool(masks[bag_ix] & bits) == positive
+        return Predicate(smv, fn, cost=1)
+
+    elif key in ['stupid']:
+        fn = lambda bag_ix, bag: bag.is_stupid == bool(val)
+        return Predicate(smv, fn, cost=0)
+
+    elif key in ['monocolor', 'multicolor']:
+        ix: int = Card.colors
+        single: bool = bool((val and key in ['monocolor']) or (not val and key in ['multicolor']))
+        fn = lambda cards: [x for x in cards if (',' not in (x[ix] or '')) == single]
+        return Predicate(smv, fn, printing=True, cost=1)
+
+    return None
+
+def compile_query(smvs: list[SmartVal], owned: set[str]) -> list[Predicate]:
+    """compiles every SmartVal once per query, cheapest and most selective first"""
+    predicates: list[Predicate] = [compile_smartval(smv, owned) for smv in smvs]
+    predicates = [x for x in predicates if x is not None]
+    predicates.sort(key=lambda x: (x.cost, x.estimate))
+    return predicates
+
+class SearchCache:
+    """
+    least recently used search results keyed on the parsed SmartVals, so "cmc=3 type=goblin" and "type=goblin
+    cmc=3" shares the same entry. bounded by both entries and the total amount of cached cards. everything is
+    dropped when MTGData changes (legalities inserted, databases rebuilt) and entries that asks for owned are
+    dropped when Owned changes. the last search is also remembered on its own, a query that only adds terms to it
+    can never find a name it didnt, so only those bags have to be searched again
+    """
+    lock = threading.RLock()  # searches runs on both the gui thread and the search thread
+    max_entries: int = 128
+    max_cards: int = 250_000
+    entries: OrderedDict = OrderedDict()
+    cards: int = 0
+    generation: int = -1
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    refinements: int = 0
+
+    last_key: frozenset = frozenset()
+    last_owned: int | None = None
+    last_bag_ixs: list[int] = []
+    name_ix: dict[str, int] = {}
+
+    @staticmethod
+    def make_key(smvs: list[SmartVal]) -> tuple:
+        # type is part of the key since True == 1 would otherwise collide
+        return tuple(sorted((x.key, x.sep, type(x.val).__name__, x.val) for x in smvs))
+
+    @staticmethod
+    def owned_generation(smvs: list[SmartVal]) -> int | None:
+        return Owned.generation if any(x.key in ['owned'] for x in smvs) else None
+
+    @staticmethod
+    def validate():
+        if MTGData.generation != SearchCache.generation:
+            SearchCache.clear()
+            SearchCache.generation = MTGData.generation
+
+    @staticmethod
+    def get(smvs: list[SmartVal]) -> list | None:
+        SearchCache.validate()
+        key: tuple = SearchCache.make_key(smvs)
+        entry: tuple | None = SearchCache.entries.get(key)
+        if entry is None or entry[0] != SearchCache.owned_generation(smvs):
+            SearchCache.misses += 1
+            return None
+
+        SearchCache.hits += 1
+        SearchCache.entries.move_to_end(key)
+        return [dict(card=card, bag=bag, showcase=None) for card, bag in entry[1]]
+
+    @staticmethod
+    def put(smvs: list[SmartVal], cards_queue: list[dict]):
+        if len(cards_queue) > SearchCache.max_cards:
+            return
+
+        key: tuple = SearchCache.make_key(smvs)
+        SearchCache.discard(key)
+        pairs: list[tuple] = [(x['card'], x['bag']) for x in cards_queue]
+        SearchCache.entries[key] = (SearchCache.owned_generation(smvs), pairs)
+        SearchCache.cards += len(pairs)
+
+        while len(SearchCache.entries) > SearchCache.max_entries or SearchCache.cards > SearchCache.max_cards:
+            SearchCache.discard(next(iter(SearchCache.entries)))
+            SearchCache.evictions += 1
+
+    @staticmethod
+    def refine_from(smvs: list[SmartVal]) -> list[int] | None:
+        """bag indexes from the last search when smvs holds every term it had and then some"""
+        key: frozenset = frozenset(SearchCache.make_key(smvs))
+        if not SearchCache.last_key or not SearchCache.last_key < key:
+            return None
+
+        if SearchCache.last_owned is not None and SearchCache.last_owned != Owned.generation:
+            return None
+
+        SearchCache.refinements += 1
+        return SearchCache.last_bag_ixs
+
+    @staticmethod
+    def remember(smvs: list[SmartVal], cards_queue: list[dict]):
+        if not SearchCache.name_ix:
+            SearchCache.name_ix = {name: n for n, name in enumerate(MTGData.NAME_BAG)}
+
+        name_ix: dict[str, int] = SearchCache.name_ix
+        SearchCache.last_key = frozenset(SearchCache.make_key(smvs))
+        SearchCache.last_owned = SearchCache.owned_generation(smvs)
+        SearchCache.last_bag_ixs = sorted(name_ix[x['card'][Card.name]] for x in cards_queue)
+
+    @staticmethod
+    def discard(key: tuple):
+        entry: tuple | None = SearchCache.entries.pop(key, None)
+        if entry is not None:
+            SearchCache.cards -= len(entry[1])
+
+    @staticmethod
+    def clear():
+        SearchCache.entries.clear()
+        SearchCache.cards = 0
+        SearchCache.last_key = frozenset()
+        SearchCache.last_bag_ixs = []
+        SearchCache.name_ix = {}
+
+    @staticmethod
+    def stats() -> dict:
+        return dict(
+            hits=SearchCache.hits,
+            misses=SearchCache.misses,
+            evictions=SearchCache.evictions,
+            refinements=SearchCache.refinements,
+            entries=len(SearchCache.entries),
+            cards=SearchCache.cards,
+        )
 
-def search_cards(text: str, custom_smartkeys: list[SmartKey] | None = None) -> list:
+def search_cards(text: str | list[SmartVal], custom_smartkeys: list[SmartKey] | None = None, explain: bool = False) -> list | tuple:
+    """
+    returns a queue of dict(card=..., bag=..., showcase=None), one per name. text is either a query or what
+    tweak_smartvals/SmartArgs already parsed. with explain the queue comes back together with the plan that
+    produced it: dict(engine=..., ms=..., steps=[...]) and the cache is bypassed
+    """
+    if isinstance(text, str):
+        smvs: list[SmartVal] = SmartArgs(query=text, smartkeys=custom_smartkeys or smartkeys).results
+    else:
+        smvs: list[SmartVal] = SmartArgs.singleton_results(text)
+    with SearchCache.lock:
+        if explain:
+            return search_smartvals(smvs, explain=True)
+
+        cards_queue: list | None = SearchCache.get(smvs)
+        if cards_queue is None:
+            cards_queue = search_smartvals(smvs, bag_ixs=SearchCache.refine_from(smvs))
+            SearchCache.put(smvs, cards_queue)
+
+        SearchCache.remember(smvs, cards_queue)
+        return cards_queue
+
+def search_smartvals(smvs: list[SmartVal], explain: bool = False, bag_ixs: list[int] | None = None) -> list | tuple:
+    """bag_ixs limits the search to those bags (NAME_BAG order)"""
+    timer_start: float = time.time()
     cards_queue: list = []
-    smvs: list[SmartVal] = SmartArgs(query=text, smartkeys=custom_smartkeys or smartkeys).results
     allowed_setcodes: set[str] = set(MTGData.SETCODE_EXPNAME.keys())
     owned: set[str] = set()
     for smv in smvs:
         key, sep, val = smv
 
-        if key in ['setcode', 'expansion']:
-            boxes: list = [dict(setcode=x, expansion=MTGData.SETCODE_EXPNAME[x]) for x in allowed_setcodes]
-            for box in boxes:
-                if '==' in sep:
-                    good: bool = val in box[key].lower()
-                elif '!=' in sep:
-                    good: bool = val not in box[key].lower()
-                elif '>=' in sep:
-                    good: bool = val >= box[key].lower()
-                elif '<=' in sep:
-                    good: bool = val <= box[key].lower()
-                elif '>' in sep:
-                    good: bool = val > box[key].lower()
-                elif '<' in sep:
-                    good: bool = val < box[key].lower()
-                else:
-                    good: bool = False
+        if key in ['expansion'] and sep in ['==', '!=']:
+            hits: set[str] = CardTrigrams.matching_setcodes(val)
+            allowed_setcodes = {x for x in allowed_setcodes if (x in hits) == ('==' in sep)}
 
-                if not good and box['setcode'] in allowed_setcodes:
-                    allowed_setcodes.remove(box['setcode'])
+        elif key in ['setcode', 'expansion']:
+            allowed_setcodes -= SetIndex.failing_names(key, sep, val)
 
         elif key in ['year']:
-            q: str = 'select setcode, releasedate_string from sets'
-            setcode_date: dict = {k: v for k, v in MTGData.cursor.execute(q).fetchall()}
-            if len(val) == 4 and val.isdigit():
-                setcode_date = {k: v[:4] for k,v in setcode_date.items()}
-
-            elif val.upper() in setcode_date:
-                val = setcode_date[val.upper()]
-
-            for setcode, year in setcode_date.items():
-                if '==' in sep:
-                    good: bool = year == val
-                elif '!=' in sep:
-                    good: bool = year != val
-                elif '>=' in sep:
-                    good: bool = val <= year
-                elif '<=' in sep:
-                    good: bool = val >= year
-                elif '>' in sep:
-                    good: bool = val < year
-                elif '<' in sep:
-                    good: bool = val > year
-                else:
-                    good: bool = False
-
-                if not good and setcode in allowed_setcodes:
-                    allowed_setcodes.remove(setcode)
+            allowed_setcodes -= SetIndex.failing_years(sep, val)
 
         elif key in ['owned']:
             owned = Owned.get_owned()
 
         elif key in ['legal', 'banned', 'restricted']:
-            if all(bag.legal == {} for name, bag in MTGData.NAME_BAG.items()):
-                MTGData.insert_legalities()
-
-    for card_name, bag in MTGData.NAME_BAG.items():
-        card: tuple = bag.prefered
-        cards: list = [x for x in bag.cards if x[Card.setcode] in allowed_setcodes]
-        good: bool = any(cards)
-        for smv in smvs:
-            if not good or not cards:
-                break
-
-            key, sep, val = smv
-            if key in ['power', 'toughness', 'cmc']:
-
-                if key in 'cmc':
-                    val = int(val)
-                    ix: int = Card.cmc
-                else:
-                    val = float(val)
-                    if key in 'power':
-                        ix: int = Card.power
-                    else:
-                        ix: int = Card.toughness
-
-                    if card[ix] is None:
-                        good = '!=' in sep
-                        continue
-
-                if '==' in sep:
-                    good = card[ix] == val
-                elif '!=' in sep:
-                    good = card[ix] != val
-                elif '>=' in sep:
-                    good = card[ix] >= val
-                elif '<=' in sep:
-                    good = card[ix] <= val
-                elif '>' in sep:
-                    good = card[ix] > val
-                elif '<' in sep:
-                    good = card[ix] < val
-
-            elif key in ['number']:
-                ix: int = Card.number
-                if '==' in sep:
-                    str_val: str = str(val)
-                    cards = [x for x in cards if x[ix] == str_val]
-                elif '!=' in sep:
-                    str_val: str = str(val)
-                    cards = [x for x in cards if x[ix] != str_val]
-                else:
-                    cards = [x for x in cards if x[ix].isdigit()]
-                    if '>=' in sep:
-                        cards = [x for x in cards if int(x[ix]) >= val]
-                    elif '<=' in sep:
-                        cards = [x for x in cards if int(x[ix]) <= val]
-                    elif '>' in sep:
-                        cards = [x for x in cards if int(x[ix]) > val]
-                    elif '<' in sep:
-                        cards = [x for x in cards if int(x[ix]) < val]
-
-            elif key in ['name', 'specbox', 'type']:
-
-                if key in 'name':
-                    ix: int = Card.name
-                else:
-                    ix: int = Card.type
-
-                if not isinstance(card[ix], str):
-                    good = '!=' in sep
-                    continue
-
-                if '==' in sep:
-                    good = val in card[ix].lower()
-                elif '!=' in sep:
-                    good = val not in card[ix].lower()
-                elif '>=' in sep:
-                    good = val >= card[ix].lower()
-                elif '<=' in sep:
-                    good = val <= card[ix].lower()
-                elif '>' in sep:
-                    good = val > card[ix].lower()
-                elif '<' in sep:
-                    good = val < card[ix].lower()
-
-            elif key in ['artist']:
-                ix: int = Card.artist
-                if '!=' in sep:
-                    cards = [x for x in cards if val not in (x[ix] or '').lower()]
-                else:
-                    cards = [x for x in cards if x[ix] is not None]
-                    if '==' in sep:
-                        cards = [x for x in cards if val in x[ix].lower()]
-                    elif '>=' in sep:
-                        cards = [x for x in cards if val >= x[ix].lower()]
-                    elif '<=' in sep:
-                        cards = [x for x in cards if val <= x[ix].lower()]
-                    elif '>' in sep:
-                        cards = [x for x in cards if val > x[ix].lower()]
-                    elif '<' in sep:
-                        cards = [x for x in cards if val < x[ix].lower()]
-
-            elif key in MTG_TYPES:
-                ix: int = Card.types
-                if val:
-                    cards = [x for x in cards if key in x[ix].lower()]
-                else:
-                    cards = [x for x in cards if key not in x[ix].lower()]
-
-            elif key in ['textbox', 'keywords', 'colors', 'cost']:
-                if key in ['textbox']:
-                    ix: int = Card.text
-                elif key in ['colors']:
-                    ix: int = Card.color_identity
-                elif key in ['cost']:
-                    ix: int = Card.mana_cost
-                else:
-                    ix: int = Card.keywords
-
-                if not isinstance(card[ix], str):
-                    good = '!=' in sep
-                    continue
-
-                if sep in '==':
-                    good = val in card[ix].lower()
-                else:
-                    good = val not in card[ix].lower()
-
-            elif key in ['rarity'] or key in RARITIES:
-                ix: int = Card.rarity
-                if key in RARITIES:
-                    if (val and sep in '==') or (not val and sep in '!='):
-                        cards = [x for x in cards if key == x[ix]]
-                    else:
-                        cards = [x for x in cards if key != x[ix]]
-                else:
-                    if (val and sep in '==') or (not val and sep in '!='):
-                        cards = [x for x in cards if x[ix].startswith(val)]
-                    else:
-                        cards = [x for x in cards if not x[ix].startswith(val)]
-
-            elif key in ['owned']:
-                ix: int = Card.scryfall_id
-                if val:
-                    cards = [x for x in cards if x[ix] in owned]
-                else:
-                    cards = [x for x in cards if x[ix] not in owned]
-
-            elif key in ['legal', 'banned', 'restricted']:
-                if sep in '==':
-                    good = any(fmt.startswith(val) for fmt in bag.legal[key])
-                else:
-                    good = all(not fmt.startswith(val) for fmt in bag.legal[key])
-
-            elif key in ['stupid']:
-                if val:
-                    good = bag.is_stupid
-                else:
-                    good = not bag.is_stupid
-
-            elif key in ['monocolor', 'multicolor']:
-                ix: int = Card.colors
-                if (val and key in ['monocolor']) or (not val and key in ['multicolor']):
-                    cards = [x for x in cards if ',' not in (x[ix] or '')]
-                else:
-                    cards = [x for x in cards if ',' in (x[ix] or '')]
+            Legalities.wait()
+
+    if len(allowed_setcodes) < len(MTGData.SETCODE_EXPNAME):
+        set_bag_ixs: list[int] = SetIndex.bags_in(allowed_setcodes)
+        bag_ixs = set_bag_ixs if bag_ixs is None else sorted(set(bag_ixs).intersection(set_bag_ixs))
+
+    if CardColumns.enabled:
+        steps: list[dict] | None = [] if explain else None
+        cards_queue = CardColumns.search(smvs, allowed_setcodes, owned, steps=steps, bag_ixs=bag_ixs)
+        if explain:
+            return cards_queue, dict(engine='columns', ms=(time.time() - timer_start) * 1000, steps=steps)
+        return cards_queue
+
+    plan: list[Predicate] = compile_query(smvs, owned)
+    if len(allowed_setcodes) < len(MTGData.SETCODE_EXPNAME):
+        fn = lambda cards: [x for x in cards if x[Card.setcode] in allowed_setcodes]
+        setcode_filter = Predicate(SmartVal('setcode', 'in', len(allowed_setcodes)), fn, printing=True, cost=0)
+        plan.insert(0, setcode_filter)
+
+    if explain:
+        [predicate.count() for predicate in plan]
+
+    bags: list = list(MTGData.NAME_BAG.values())
+    for bag_ix in range(len(bags)) if bag_ixs is None else bag_ixs:
+        bag = bags[bag_ix]
+        cards: list = bag.cards
+        for predicate in plan:
+            if predicate.printing:
+                cards = predicate.fn(cards)
+                if not cards:
+                    break
 
-        if not good or not cards:
-            continue
-        elif bag.prefered in cards:
-            card = bag.prefered
+            elif not predicate.fn(bag_ix, bag):
+                break
         else:
-            for iter_card in cards:
-                if MTGData.setcode_type[iter_card[Card.setcode]] in ['expansion', 'core']:
-                    card = iter_card
-                    break
+            if bag.prefered in cards:
+                card = bag.prefered
             else:
-                card = cards[0]
+                for iter_card in cards:
+                    if MTGData.setcode_type[iter_card[Card.setcode]] in ['expansion', 'core']:
+                        card = iter_card
+                        break
+                else:
+                    card = cards[0]
+
+            cards_queue.append(dict(card=card, bag=bag, showcase=None))
 
-        cards_queue.append(dict(card=card, bag=bag, showcase=None))
+    if explain:
+        steps: list[dict] = [predicate.describe() for predicate in plan]
+        return cards_queue, dict(engine='python', ms=(time.time() - timer_start) * 1000, steps=steps)
 
     return cards_queue
 
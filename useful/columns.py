@@ -0,0 +1,311 @@
+from useful.database import Card, Legalities, MTGData
+from useful.trigrams import CardTrigrams
+from array import array
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CardColumns:
+    """
+    every printing from MTGData.NAME_BAG as numpy columns, rows are laid out bag by bag in the same order as
+    bag.cards so a reduction over rows gives the exact same queue as walking NAME_BAG in python
+    """
+    enabled: bool = np is not None
+    built: bool = False
+
+    rows: list[tuple] = []
+    bags: list = []
+
+    bag_of = None  # bag index per printing
+    pref_row = None  # row of bag.prefered per bag
+    is_pref = None
+    is_core = None
+    is_stupid = None
+
+    # numerics, None is stored as nan which gives the same outcome as the python comparisons
+    cmc = None
+    power = None
+    toughness = None
+    number = None
+
+    # dictionary encoded, codes per printing and a list of the distinct values
+    codes: dict = {}
+    values: dict[str, list] = {}
+
+    # lowercased strings from the prefered printing, one per bag
+    pref_strings: dict[str, list[str | None]] = {}
+
+    scryfall_row: dict[str, int] = {}
+    setcode_rows: dict = {}  # setcode -> rows with a printing from that set
+
+    categorical: dict[str, int] = {}
+    pref_columns: dict[str, int] = {}
+
+    @staticmethod
+    def build():
+        timer_start: float = time.time()
+        obj = CardColumns
+        obj.categorical = dict(
+            setcode=Card.setcode,
+            rarity=Card.rarity,
+            layout=Card.layout,
+            artist=Card.artist,
+            types=Card.types,
+            colors=Card.colors,
+            number=Card.number,
+        )
+        obj.pref_columns = dict(
+            name=Card.name,
+            type=Card.type,
+            textbox=Card.text,
+            keywords=Card.keywords,
+            colors=Card.color_identity,
+            cost=Card.mana_cost,
+        )
+
+        rows: list[tuple] = []
+        bags: list = []
+        bag_of: list[int] = []
+        pref_row: list[int] = []
+        for bag_ix, bag in enumerate(MTGData.NAME_BAG.values()):
+            bags.append(bag)
+            for card in bag.cards:
+                if card is bag.prefered:
+                    pref_row.append(len(rows))
+                rows.append(card)
+                bag_of.append(bag_ix)
+
+        obj.rows = rows
+        obj.bags = bags
+        obj.bag_of = np.array(bag_of, dtype=np.int32)
+        obj.pref_row = np.array(pref_row, dtype=np.int32)
+        obj.is_pref = np.zeros(len(rows), dtype=bool)
+        obj.is_pref[obj.pref_row] = True
+        obj.is_stupid = np.fromiter((bag.is_stupid for bag in bags), dtype=bool, count=len(bags))
+
+        core_setcodes: set[str] = {k for k, v in MTGData.setcode_type.items() if v in ['expansion', 'core']}
+        obj.is_core = np.fromiter((card[Card.setcode] in core_setcodes for card in rows), dtype=bool, count=len(rows))
+
+        nan: float = float('nan')
+        for var, ix in dict(cmc=Card.cmc, power=Card.power, toughness=Card.toughness).items():
+            vals = (nan if card[ix] is None else card[ix] for card in rows)
+            setattr(obj, var, np.fromiter(vals, dtype=np.float64, count=len(rows)))
+
+        obj.codes, obj.values = {}, {}
+        for var, ix in obj.categorical.items():
+            lookup: dict = {}
+            codes = np.fromiter((lookup.setdefault(card[ix], len(lookup)) for card in rows), dtype=np.int32, count=len(rows))
+            obj.codes[var] = codes
+            obj.values[var] = list(lookup)
+
+        order = np.argsort(obj.codes['setcode'], kind='stable')
+        bounds = np.searchsorted(obj.codes['setcode'][order], np.arange(len(obj.values['setcode']) + 1))
+        obj.setcode_rows = {x: order[bounds[n]: bounds[n + 1]] for n, x in enumerate(obj.values['setcode'])}
+
+        number_vals: list = [float(x) if isinstance(x, str) and x.isdigit() else nan for x in obj.values['number']]
+        obj.number = np.array(number_vals, dtype=np.float64)[obj.codes['number']] if number_vals else np.zeros(0)
+
+        obj.pref_strings = {}
+        lowered: dict[str, str] = {}
+        for var, ix in obj.pref_columns.items():
+            col: list[str | None] = []
+            for row in pref_row:
+                val = rows[row][ix]
+                if isinstance(val, str):
+                    if val not in lowered:
+                        lowered[val] = val.lower()
+                    col.append(lowered[val])
+                else:
+                    col.append(None)
+            obj.pref_strings[var] = col
+
+        obj.scryfall_row = {card[Card.scryfall_id]: n for n, card in enumerate(rows)}
+        obj.built = True
+
+        timer_end: float = time.time() - timer_start
+        print(f'column store for \33[33:1:15m{len(rows)}\33[0m printings built in {round(timer_end, 2)} seconds', flush=True)
+
+    @staticmethod
+    def compare(col, sep: str, val):
+        if '==' in sep:
+            return col == val
+        elif '!=' in sep:
+            return col != val
+        elif '>=' in sep:
+            return col >= val
+        elif '<=' in sep:
+            return col <= val
+        elif '>' in sep:
+            return col > val
+        elif '<' in sep:
+            return col < val
+
+    @staticmethod
+    def matching_codes(var: str, fn) -> list[int]:
+        return [code for code, val in enumerate(CardColumns.values[var]) if fn(val)]
+
+    @staticmethod
+    def code_mask(var: str, fn):
+        codes: list[int] = CardColumns.matching_codes(var, fn)
+        return np.isin(CardColumns.codes[var], codes)
+
+    @staticmethod
+    def bag_mask(bag_ok, fn):
+        """fn(bag_ix) -> bool, only asked for the bags that are still in play"""
+        mask = np.zeros(len(bag_ok), dtype=bool)
+        bag_ixs: list[int] = np.flatnonzero(bag_ok).tolist()
+        if bag_ixs:
+            mask[bag_ixs] = [fn(ix) for ix in bag_ixs]
+        return mask
+
+    @staticmethod
+    def string_mask(var: str, sep: str, val: str, bag_ok):
+        """mirrors the name/type checks, sep can be any operator and missing strings only pass != """
+        col: list[str | None] = CardColumns.pref_strings[var]
+        if var in ['name', 'type', 'textbox', 'keywords'] and sep in ['==', '!=']:
+            mask = np.zeros(len(col), dtype=bool)
+            mask[CardTrigrams.search(var, val, negate='!=' in sep)] = True
+            return mask
+        elif '==' in sep:
+            fn = lambda ix: col[ix] is not None and val in col[ix]
+        elif '!=' in sep:
+            fn = lambda ix: col[ix] is None or val not in col[ix]
+        elif '>=' in sep:
+            fn = lambda ix: col[ix] is not None and val >= col[ix]
+        elif '<=' in sep:
+            fn = lambda ix: col[ix] is not None and val <= col[ix]
+        elif '>' in sep:
+            fn = lambda ix: col[ix] is not None and val > col[ix]
+        elif '<' in sep:
+            fn = lambda ix: col[ix] is not None and val < col[ix]
+        else:
+            return np.zeros(len(col), dtype=bool)
+
+        return CardColumns.bag_mask(bag_ok, fn)
+
+    @staticmethod
+    def describe_step(smv, printing_ok, bag_ok, timer_start: float) -> dict:
+        key, sep, val = smv
+        ms: float = (time.time() - timer_start) * 1000
+        return dict(key=key, sep=sep, val=val, printings=int(printing_ok.sum()), bags=int(bag_ok.sum()), ms=ms)
+
+    @staticmethod
+    def search(smvs: list, allowed_setcodes: set[str], owned: set[str], steps: list | None = None,
+               bag_ixs: list[int] | None = None) -> list:
+        """bag_ixs limits the search to those bags (NAME_BAG order), everything else is treated as failed"""
+        from useful.breakdown import MTG_TYPES, RARITIES
+        obj = CardColumns
+        if not obj.built:
+            obj.build()
+
+        timer_start: float = time.time()
+        if len(allowed_setcodes) < len(obj.setcode_rows):
+            printing_ok = np.zeros(len(obj.rows), dtype=bool)
+            for setcode in allowed_setcodes & obj.setcode_rows.keys():
+                printing_ok[obj.setcode_rows[setcode]] = True
+        else:
+            allowed_codes: list[int] = obj.matching_codes('setcode', lambda x: x in allowed_setcodes)
+            printing_ok = np.isin(obj.codes['setcode'], allowed_codes)
+        if bag_ixs is None:
+            bag_ok = np.ones(len(obj.bags), dtype=bool)
+        else:
+            bag_ok = np.zeros(len(obj.bags), dtype=bool)
+            bag_ok[bag_ixs] = True
+
+        if steps is not None:
+            steps.append(obj.describe_step(('setcode', 'in', len(allowed_setcodes)), printing_ok, bag_ok, timer_start))
+
+        for smv in smvs:
+            timer_start: float = time.time()
+            key, sep, val = smv
+            if key in ['power', 'toughness', 'cmc']:
+                val = int(val) if key in 'cmc' else float(val)
+                col = getattr(obj, key)[obj.pref_row]
+                bag_ok &= obj.compare(col, sep, val)
+
+            elif key in ['number']:
+                if '==' in sep:
+                    str_val: str = str(val)
+                    printing_ok &= obj.code_mask('number', lambda x: x == str_val)
+                elif '!=' in sep:
+                    str_val: str = str(val)
+                    printing_ok &= obj.code_mask('number', lambda x: x != str_val)
+                else:
+                    printing_ok &= obj.compare(obj.number, sep, val)
+
+            elif key in ['name', 'specbox', 'type']:
+                var: str = 'name' if key in 'name' else 'type'
+                bag_ok &= obj.string_mask(var, sep, val, bag_ok)
+
+            elif key in ['artist']:
+                if '!=' in sep:
+                    artists: set[str] = CardTrigrams.matching_artists(val)
+                    printing_ok &= obj.code_mask('artist', lambda x: x not in artists)
+                elif '==' in sep:
+                    artists: set[str] = CardTrigrams.matching_artists(val)
+                    printing_ok &= obj.code_mask('artist', lambda x: x in artists)
+                elif '>=' in sep:
+                    printing_ok &= obj.code_mask('artist', lambda x: x is not None and val >= x.lower())
+                elif '<=' in sep:
+                    printing_ok &= obj.code_mask('artist', lambda x: x is not None and val <= x.lower())
+                elif '>' in sep:
+                    printing_ok &= obj.code_mask('artist', lambda x: x is not None and val > x.lower())
+                elif '<' in sep:
+                    printing_ok &= obj.code_mask('artist', lambda x: x is not None and val < x.lower())
+
+            elif key in MTG_TYPES:
+                if val:
+                    printing_ok &= obj.code_mask('types', lambda x: key in x.lower())
+                else:
+                    printing_ok &= obj.code_mask('types', lambda x: key not in x.lower())
+
+            elif key in ['textbox', 'keywords', 'colors', 'cost']:
+                bag_ok &= obj.string_mask(key, '==' if sep in '==' else '!=', val, bag_ok)
+
+            elif key in ['rarity'] or key in RARITIES:
+                positive: bool = (val and sep in '==') or (not val and sep in '!=')
+                if key in RARITIES:
+                    printing_ok &= obj.code_mask('rarity', lambda x: (key == x) == positive)
+                else:
+                    printing_ok &= obj.code_mask('rarity', lambda x: x.startswith(val) == positive)
+
+            elif key in ['owned']:
+                owned_rows: list[int] = [obj.scryfall_row[x] for x in owned if x in obj.scryfall_row]
+                mask = np.zeros(len(obj.rows), dtype=bool)
+                mask[owned_rows] = True
+                printing_ok &= mask if val else ~mask
+
+            elif key in ['legal', 'banned', 'restricted']:
+                masks = Legalities.get_masks(key)
+                bits: int = Legalities.format_bits(val)
+                if isinstance(masks, array):
+                    has = (np.frombuffer(masks, dtype=np.uint64) & np.uint64(bits)) != 0
+                else:
+                    has = obj.bag_mask(np.ones(len(obj.bags), dtype=bool), lambda ix: bool(masks[ix] & bits))
+                bag_ok &= has if sep in '==' else ~has
+
+            elif key in ['stupid']:
+                bag_ok &= obj.is_stupid if val else ~obj.is_stupid
+
+            elif key in ['monocolor', 'multicolor']:
+                single: bool = (val and key in ['monocolor']) or (not val and key in ['multicolor'])
+                printing_ok &= obj.code_mask('colors', lambda x: (',' not in (x or '')) == single)
+
+            if steps is not None:
+                steps.append(obj.describe_step(smv, printing_ok, bag_ok, timer_start))
+
+        # one printing per bag: prefered first, then the first expansion/core, otherwise the first that passed
+        rows = np.flatnonzero(printing_ok & bag_ok[obj.bag_of])
+        rank = np.where(obj.is_pref[rows], 0, np.where(obj.is_core[rows], 1, 2))
+        order = np.lexsort((rows, rank, obj.bag_of[rows]))
+        rows = rows[order]
+        bag_ixs = obj.bag_of[rows]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = bag_ixs[1:] != bag_ixs[:-1]
+
+        return [dict(card=obj.rows[row], bag=obj.bags[bag_of], showcase=None)
+                for row, bag_of in zip(rows[first].tolist(), bag_ixs[first].tolist())]
@@ -1,6 +1,21 @@
-import sqlite3,os,time
+from array import array
+import atexit,sqlite3,os,threading,time
 
-class Card:
+from useful.snapshot import Snapshot
+from useful.update_database import read_only
+
+class Lazy(type):
+    """
+    metaclass for the classes below that are filled from the database. a class attribute that isnt there yet makes
+    the class load itself (or wait for the thread already loading it) before its looked up again
+    """
+    def __getattr__(cls, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        return cls.lazy_attribute(name)
+
+class Card(metaclass=Lazy):
     artist: int
     cmc: int
     color_identity: int
@@ -21,16 +36,24 @@ class Card:
     type: int
     types: int
 
-class Set:
-    """"""
+    @staticmethod
+    def lazy_attribute(name: str) -> int:
+        MTGData.load_columns()
+        return type.__getattribute__(Card, name)
+
+class Set(metaclass=Lazy):
+    @staticmethod
+    def lazy_attribute(name: str) -> int:
+        MTGData.load_columns()
+        return type.__getattribute__(Set, name)
 
 class Bag:
+    __slots__ = 'cards', 'prefered', 'is_stupid'
+
     def __init__(self):
         self.cards: list[tuple] = []
-        self.processing: list[tuple] = []
         self.prefered: tuple | None = None
         self.is_stupid: bool = True
-        self.legal: dict = {}
 
 def database_integrity(database_path: str):
     if not os.path.exists(database_path) or not os.path.getsize(database_path):
@@ -42,168 +65,403 @@ def database_integrity(database_path: str):
                     if database_path.endswith(fname):
                         zf.extract(fname, database_path[:len(database_path) - len(fname)])
 
-class MTGData:
-    from useful.update_database import legal_card_datas, db_path_card_datas, make_quick_db, make_quick_legal_db
-    database_integrity(db_path_card_datas)
-    database_integrity(legal_card_datas)
+class MTGData(metaclass=Lazy):
+    """
+    NAME_BAG, PRINTINGS, FACES, SETCODE_TIME, SETCODES, setcode_type, SETCODE_EXPNAME and EXPNAME_SETCODE are loaded
+    the first time anything asks for them, or ahead of time on the thread preload starts. importing this module
+    touches nothing. PRINTINGS is scryfall_id to its side a (or only) printing, FACES scryfall_id to the other sides
+    """
+    from useful.update_database import legal_card_datas, db_path_card_datas
 
     names: list[str] = __file__.split(os.sep)
     subdir: str = os.sep.join(x for x in names[:-2])
 
-    if not os.path.exists(db_path_card_datas):
-        make_quick_db()
+    generation: int = 0  # bumped whenever something search_cards depends on changes
 
-    if not os.path.exists(legal_card_datas):
-        make_quick_legal_db()
-
-    print(f'initializing database, ', end='', flush=True)
-    create_start: float = time.time()
+    lock = threading.RLock()
+    columns_lock = threading.Lock()
+    loaded = threading.Event()
+    thread: threading.Thread | None = None
+    columns: tuple | None = None
+    local = threading.local()
 
     @staticmethod
     def sort_namebag(NAME_BAG: dict, SETCODE_TIME: dict, setcode_type: dict):
-        for name, bag in NAME_BAG.items():
-            bag.cards.sort(key=lambda x: SETCODE_TIME[x[Card.setcode]], reverse=True)
-            for card in bag.cards:
-                if setcode_type[card[Card.setcode]] in ['expansion', 'core']:
-                    prefered_setcode: str = card[Card.setcode]
-                    bag.is_stupid = False
-                    break
+        """
+        newest printing first, then the prefered printing is the one with the lowest rank key:
+        (set tier, where its set first shows up, commas in frame_effects, collector number digits, position).
+        tier 0 is expansion/core (the only thing that makes a bag not stupid), 1 is a three letter
+        draft_innovation/masters set, 2 any other three letter set and 3 the rest
+        """
+        tiers: dict[str, int] = {}
+        for setcode in SETCODE_TIME:
+            exptype: str | None = setcode_type.get(setcode)
+            if exptype in ['expansion', 'core']:
+                tiers[setcode] = 0
+            elif len(setcode) == 3:
+                tiers[setcode] = 1 if exptype in ['draft_innovation', 'masters'] else 2
             else:
-                for card in bag.cards:
-                    if setcode_type[card[Card.setcode]] in ['draft_innovation', 'masters'] and len(
-                            card[Card.setcode]) == 3:
-                        prefered_setcode: str = card[Card.setcode]
-                        break
-                else:
-                    for card in bag.cards:
-                        if len(card[Card.setcode]) == 3:
-                            prefered_setcode: str = card[Card.setcode]
-                            break
-                    else:
-                        prefered_setcode: str = bag.cards[0][Card.setcode]
+                tiers[setcode] = 3
+
+        number_digits: dict[str | None, int] = {}
+        frame_commas: dict[str | None, int] = {}
+        setcode_ix, number_ix, frame_ix = Card.setcode, Card.number, Card.frame_effects
+        for bag in NAME_BAG.values():
+            cards: list[tuple] = bag.cards
+            cards.sort(key=lambda x: SETCODE_TIME[x[setcode_ix]], reverse=True)
+
+            first_pos: dict[str, int] = {}
+            best: tuple | None = None
+            for pos, card in enumerate(cards):
+                number: str | None = card[number_ix]
+                if number not in number_digits:
+                    number_digits[number] = int(''.join([x for x in (number or '') if x.isdigit()] or ['-1']))
+
+                frame: str | None = card[frame_ix]
+                if frame not in frame_commas:
+                    frame_commas[frame] = (frame or '').count(',')
+
+                setcode: str = card[setcode_ix]
+                rank: tuple = tiers[setcode], first_pos.setdefault(setcode, pos), frame_commas[frame], number_digits[number], pos
+                if best is None or rank < best:
+                    best = rank
+                    bag.prefered = card
+
+            bag.is_stupid = best[0] > 0
+
+    @staticmethod
+    def prepare_databases():
+        from useful.update_database import make_quick_db, make_quick_legal_db
+        database_integrity(MTGData.db_path_card_datas)
+        database_integrity(MTGData.legal_card_datas)
+
+        if not os.path.exists(MTGData.db_path_card_datas):
+            make_quick_db()
+
+        if not os.path.exists(MTGData.legal_card_datas):
+            make_quick_legal_db()
 
-            cards: list[tuple] = [x for x in bag.cards if x[Card.setcode] == prefered_setcode]
-            if len(cards) == 1:
-                bag.prefered = cards[0]
+    @staticmethod
+    def load_columns():
+        """Card and Set column numbers, a pragma away so they never wait for the cards themselves"""
+        with MTGData.columns_lock:
+            if MTGData.columns is not None:
+                return
+
+            MTGData.prepare_databases()
+            connection = read_only(MTGData.db_path_card_datas)
+            q: str = 'PRAGMA table_info(cards)'
+            card_columns: list[tuple] = [(col_num, col_name) for col_num, col_name, *_ in connection.execute(q).fetchall()]
+            q: str = 'PRAGMA table_info(sets)'
+            set_columns: list[tuple] = [(col_num, col_name) for col_num, col_name, *_ in connection.execute(q).fetchall()]
+            connection.close()
+
+            [setattr(Card, col_name, col_num) for col_num, col_name in card_columns]
+            [setattr(Set, col_name, col_num) for col_num, col_name in set_columns]
+            MTGData.columns = tuple(card_columns), tuple(set_columns)
+
+    @staticmethod
+    def compact_rows(rows: list[tuple]) -> list[tuple]:
+        """
+        every value except scryfall_id shared through a pool per column, so the artist, setcode, type, text and so on
+        that hundreds of printings repeats are one object each. the snapshot keeps the sharing since marshal writes
+        an object it has already seen as a reference
+        """
+        pools: list[dict] = [{} for _ in range(len(rows[0]) if rows else 0)]
+        pools[Card.scryfall_id] = None
+        compact: list[tuple] = []
+        for row in rows:
+            compact.append(tuple(val if pool is None or val is None else pool.setdefault(val, val) for val, pool in zip(row, pools)))
+        return compact
+
+    @staticmethod
+    def load():
+        with MTGData.lock:
+            if MTGData.loaded.is_set():
+                return
+
+            print(f'initializing database, ', end='', flush=True)
+            create_start: float = time.time()
+            MTGData.load_columns()
+
+            snapshot: dict | None = Snapshot.load(MTGData.db_path_card_datas, MTGData.columns)
+            if snapshot is not None:
+                SETCODE_TIME: dict[str, int] = snapshot['SETCODE_TIME']
+                setcode_type: dict = snapshot['setcode_type']
+                SETCODE_EXPNAME: dict = snapshot['SETCODE_EXPNAME']
+                NAME_BAG: dict[str, Bag] = {}
+                for cardname, cards, prefered_ix, is_stupid in snapshot['bags']:
+                    bag = NAME_BAG[cardname] = Bag()
+                    bag.cards, bag.prefered, bag.is_stupid = cards, cards[prefered_ix], is_stupid
+                outside_bags: list[tuple] = snapshot['outside_bags']
+                other_faces: list[tuple] = snapshot['other_faces']
+            else:
+                connection = read_only(MTGData.db_path_card_datas)
+                cursor = connection.cursor()
+                q: str = (f'select setcode, releasedate_epoch from sets '
+                          f'where setcode is not null '
+                          f'and releasedate_epoch is not null '
+                          f'and type is not null')
+
+                SETCODE_TIME: dict[str, int] = {setcode: release_epoch for setcode, release_epoch in cursor.execute(q).fetchall()}
+
+                q: str = 'select * from cards'
+                NAME_BAG: dict[str, Bag] = {}
+                outside_bags: list[tuple] = []
+                other_faces: list[tuple] = []
+                for card in MTGData.compact_rows(cursor.execute(q).fetchall()):
+                    if card[Card.side] not in [None, 'a']:
+                        other_faces.append(card)
+                    elif card[Card.setcode] in SETCODE_TIME:
+                        cardname: str = card[Card.name]
+                        if cardname not in NAME_BAG:
+                            NAME_BAG[cardname] = Bag()
+                        NAME_BAG[cardname].cards.append(card)
+                    else:
+                        outside_bags.append(card)
+
+                placehldrs: str = ','.join(['?'] * len(SETCODE_TIME))
+                q: str = f'select setcode, type from sets where setcode in ({placehldrs})'
+                setcode_type: dict = {setcode: exptype for setcode, exptype in cursor.execute(q, list(SETCODE_TIME)).fetchall()}
+
+                q: str = f'select setcode, name from sets where setcode in ({placehldrs})'
+                SETCODE_EXPNAME: dict = {setcode: expname for setcode, expname in cursor.execute(q, list(SETCODE_TIME)).fetchall()}
+                cursor.close()
+                connection.close()
+
+                sort_start: float = time.time()
+                MTGData.sort_namebag(NAME_BAG, SETCODE_TIME, setcode_type)
+                sort_end: float = time.time() - sort_start
+
+                Snapshot.save(MTGData.db_path_card_datas, dict(
+                    columns=MTGData.columns,
+                    SETCODE_TIME=SETCODE_TIME,
+                    setcode_type=setcode_type,
+                    SETCODE_EXPNAME=SETCODE_EXPNAME,
+                    bags=[(name, bag.cards, bag.cards.index(bag.prefered), bag.is_stupid) for name, bag in NAME_BAG.items()],
+                    outside_bags=outside_bags,
+                    other_faces=other_faces,
+                ))
+
+            # first row wins, same printing a fetchone on the cards table would have answered with
+            PRINTINGS: dict[str, tuple] = {}
+            for bag in NAME_BAG.values():
+                [PRINTINGS.setdefault(card[Card.scryfall_id], card) for card in bag.cards]
+            [PRINTINGS.setdefault(card[Card.scryfall_id], card) for card in outside_bags]
+
+            FACES: dict[str, tuple] = {}
+            for card in other_faces:
+                FACES[card[Card.scryfall_id]] = FACES.get(card[Card.scryfall_id], ()) + (card,)
+
+            MTGData.SETCODE_TIME = SETCODE_TIME
+            MTGData.SETCODES = set(SETCODE_TIME)
+            MTGData.setcode_type = setcode_type
+            MTGData.SETCODE_EXPNAME = SETCODE_EXPNAME
+            MTGData.EXPNAME_SETCODE = {expname: setcode for setcode, expname in SETCODE_EXPNAME.items()}
+            MTGData.NAME_BAG = NAME_BAG
+            MTGData.PRINTINGS = PRINTINGS
+            MTGData.FACES = FACES
+            MTGData.generation += 1
+            MTGData.loaded.set()
+
+            create_end: float = time.time() - create_start
+            if snapshot is not None:
+                print(f'\33[33:1:15m{len(NAME_BAG)}\33[0m cards loaded from snapshot in {round(create_end, 2)} seconds', flush=True)
             else:
-                card_val: list[tuple] = [(card, (card[Card.frame_effects] or '').count(',')) for card in cards]
-                card_val.sort(key=lambda x: x[1])
-                card_val = [x for x in card_val if x[1] == card_val[0][1]]
-                if len(card_val) > 1:
-                    dual: list[tuple] = []
-                    for card, _ in card_val:
-                        digs: str = ''.join([x for x in (card[Card.number] or '') if x.isdigit()] or ['-1'])
-                        dual.append((card, int(digs)))
-                    dual.sort(key=lambda x: x[1])
-                    bag.prefered = dual[0][0]
-                else:
-                    bag.prefered = card_val[0][0]
-
-    connection = sqlite3.connect(db_path_card_datas)
-    cursor = connection.cursor()
-
-    q: str = 'PRAGMA table_info(cards)'
-    [setattr(Card, col_name, col_num) for col_num, col_name, *_ in cursor.execute(q).fetchall()]
-
-    q: str = 'PRAGMA table_info(sets)'
-    [setattr(Set, col_name, col_num) for col_num, col_name, *_ in cursor.execute(q).fetchall()]
-
-
-    q: str = (f'select setcode, releasedate_epoch from sets '
-              f'where setcode is not null '
-              f'and releasedate_epoch is not null '
-              f'and type is not null')
-
-    SETCODE_TIME: dict[str, int] = {setcode: release_epoch for setcode, release_epoch in cursor.execute(q).fetchall()}
-    SETCODES: set[str] = set()
-    for setcode in SETCODE_TIME:
-        SETCODES.add(setcode)
-
-    q: str = 'select * from cards where (side is "a" or side is null)'
-    all_cards: list[tuple] = cursor.execute(q).fetchall()
-    NAME_BAG: dict[str, Bag] = {}
-    for card in all_cards:
-        cardname: str = card[Card.name]
-        setcode: str = card[Card.setcode]
-        if setcode in SETCODES:
-            if cardname not in NAME_BAG:
-                NAME_BAG[cardname] = Bag()
-            NAME_BAG[cardname].cards.append(card)
-
-    placehldrs: str = ','.join(['?'] * len(SETCODES))
-    q: str = f'select setcode, type from sets where setcode in ({placehldrs})'
-    setcode_type: dict = {setcode: exptype for setcode, exptype in cursor.execute(q, list(SETCODES)).fetchall()}
-
-    q: str = f'select setcode, name from sets where setcode in ({placehldrs})'
-    SETCODE_EXPNAME: dict = {setcode: expname for setcode, expname in cursor.execute(q, list(SETCODES)).fetchall()}
-    EXPNAME_SETCODE: dict = {expname: setcode for setcode, expname in SETCODE_EXPNAME.items()}
-
-    sort_start: float = time.time()
-    sort_namebag(NAME_BAG, SETCODE_TIME, setcode_type)
-    sort_end: float = time.time() - sort_start
-
-    create_end: float = time.time() - create_start
-    print(f'\33[33:1:15m{len(NAME_BAG)}\33[0m cards loaded into ram in {round(create_end, 2)} seconds (\33[38:5:249msorting {round(sort_end, 2)}\33[0m)', flush=True)
+                print(f'\33[33:1:15m{len(NAME_BAG)}\33[0m cards loaded into ram in {round(create_end, 2)} seconds (\33[38:5:249msorting {round(sort_end, 2)}\33[0m)', flush=True)
+
+    @staticmethod
+    def preload():
+        """starts loading on a thread of its own, legalities and prices follows right after"""
+        if MTGData.thread is None:
+            MTGData.thread = threading.Thread(target=lambda: (MTGData.load(), Legalities.preload(), Prices.preload()))
+            MTGData.thread.daemon = True
+            MTGData.thread.start()
+
+    @staticmethod
+    def lazy_attribute(name: str):
+        if name in ['cursor', 'connection']:
+            MTGData.load()
+            cursor: sqlite3.Cursor = MTGData.get_cursor()
+            return cursor if name in 'cursor' else cursor.connection
+
+        if name not in ['NAME_BAG', 'PRINTINGS', 'FACES', 'SETCODE_TIME', 'SETCODES', 'setcode_type', 'SETCODE_EXPNAME', 'EXPNAME_SETCODE']:
+            raise AttributeError(f"type object 'MTGData' has no attribute '{name}'")
+
+        MTGData.load()
+        return type.__getattribute__(MTGData, name)
+
+    @staticmethod
+    def get_cursor() -> sqlite3.Cursor:
+        """MTGData.cursor belongs to the main thread, every other thread gets a connection of its own"""
+        if threading.current_thread() is threading.main_thread():
+            if 'cursor' not in MTGData.__dict__:
+                MTGData.prepare_databases()
+                MTGData.connection = read_only(MTGData.db_path_card_datas)
+                MTGData.cursor = MTGData.connection.cursor()
+            return MTGData.cursor
+
+        if getattr(MTGData.local, 'cursor', None) is None:
+            MTGData.prepare_databases()
+            MTGData.local.cursor = read_only(MTGData.db_path_card_datas).cursor()
+
+        return MTGData.local.cursor
 
     @staticmethod
     def insert_legalities():
+        Legalities.load()
+
+
+def get_card(scryfall_id: str, side: str | None = 'a') -> tuple | None:
+    """the printing with that scryfall_id, side a covers single faced cards as well"""
+    if side in [None, 'a']:
+        return MTGData.PRINTINGS.get(scryfall_id)
+
+    for card in MTGData.FACES.get(scryfall_id, ()):
+        if card[Card.side] == side:
+            return card
+
+def get_faces(scryfall_id: str) -> list[tuple]:
+    """every face that printing has, side a first"""
+    card: tuple | None = MTGData.PRINTINGS.get(scryfall_id)
+    return ([card] if card else []) + list(MTGData.FACES.get(scryfall_id, ()))
+
+
+class Legalities:
+    """
+    legal/banned/restricted as one bitmask per bag in MTGData.NAME_BAG order, bit n is set when the card has that
+    status in formats[n] (array of uint64, a plain list if there ever are more than 64 formats). loads on a
+    background thread from startup, legal searches waits for it
+    """
+    statuses: tuple = 'legal', 'banned', 'restricted'
+    formats: list[str] = []
+    masks: dict[str, array] = {}
+    loaded = threading.Event()
+    thread: threading.Thread | None = None
+
+    @staticmethod
+    def load():
         from useful.update_database import legal_card_datas
         print(f'beginning legalities insertion, ', end='', flush=True)
         timer_start: float = time.time()
-        q: str = 'select name, csv_status from legalities'
-        legal_connection = sqlite3.connect(legal_card_datas)
-        legal_cursor = legal_connection.cursor()
-        name_csv: dict = {name: csv for name, csv in legal_cursor.execute(q).fetchall()}
-        legal_cursor.close()
-        legal_connection.close()
-
-        for name, bag in MTGData.NAME_BAG.items():
-            bag.legal = dict(legal=set(), banned=set(), restricted=set())
-            if name in name_csv:
-                parts: list = name_csv[name].lower().split(',')
-                for part in parts:
+        try:
+            q: str = 'select name, csv_status from legalities'
+            legal_connection = read_only(legal_card_datas)
+            legal_cursor = legal_connection.cursor()
+            name_csv: dict = {name: csv for name, csv in legal_cursor.execute(q).fetchall()}
+            legal_cursor.close()
+            legal_connection.close()
+
+            format_bit: dict[str, int] = {}
+            masks: dict[str, list[int]] = {status: [0] * len(MTGData.NAME_BAG) for status in Legalities.statuses}
+            for bag_ix, name in enumerate(MTGData.NAME_BAG):
+                if name not in name_csv:
+                    continue
+
+                for part in name_csv[name].lower().split(','):
                     fmt, status = part.split(':')
-                    if status in ['legal']:
-                        bag.legal['legal'].add(fmt)
-                    elif status in ['restricted']:
-                        bag.legal['restricted'].add(fmt)
-                    elif status in ['banned']:
-                        bag.legal['banned'].add(fmt)
+                    if status in masks:
+                        if fmt not in format_bit:
+                            format_bit[fmt] = len(format_bit)
+                        masks[status][bag_ix] |= 1 << format_bit[fmt]
 
+            Legalities.formats = list(format_bit)
+            Legalities.masks = {k: array('Q', v) if len(format_bit) <= 64 else v for k, v in masks.items()}
+            MTGData.generation += 1
+        finally:
+            Legalities.loaded.set()
 
         timer_end: float = time.time() - timer_start
         print(f'legal statuses for \33[33:1:15m{len(name_csv)}\33[0m different cards inserted in {round(timer_end, 2)} seconds', flush=True)
 
+    @staticmethod
+    def preload():
+        if Legalities.thread is None:
+            Legalities.thread = threading.Thread(target=Legalities.load)
+            Legalities.thread.daemon = True
+            Legalities.thread.start()
+
+    @staticmethod
+    def wait():
+        Legalities.preload()
+        Legalities.loaded.wait()
+
+    @staticmethod
+    def format_bits(val: str) -> int:
+        """every format that starts with val, same prefix rule the searchbar has always used"""
+        return sum(1 << n for n, fmt in enumerate(Legalities.formats) if fmt.startswith(val))
+
+    @staticmethod
+    def get_masks(status: str) -> array | list:
+        """one mask per bag, all zeroes when the legal database couldnt be loaded"""
+        return Legalities.masks.get(status) or [0] * len(MTGData.NAME_BAG)
+
 
 class Owned:
-    scryfall_ids: set[str] = set()
-    all_names: set[str] = set()
+    """
+    the collection, quantity per scryfall_id and foil in the collection table of user_datas.sqlite. every lookup is
+    answered from memory, changes are written in one batch FLUSH_DELAY seconds after the last one (and at exit).
+    the scryfall_ids.csv it replaces is imported once and renamed to scryfall_ids.csv.migrated
+    """
+    scryfall_ids: set[str] = set()  # every scryfall_id with a quantity, foil or not
+    quantities: dict[tuple[str, bool], int] = {}
+    name_counts: dict[str, int] = {}  # name -> how many of its printings are owned
+    generation: int = 0  # bumped whenever scryfall_ids changes
     textfile_updated: bool = False
-    textfile_imported: bool = False
+    imported: bool = False
     names_imported: bool = False
     subdir: str = os.sep.join(__file__.split(os.sep)[:-2])
     path: str = f'{subdir}{os.sep}scryfall_ids.csv'
 
-    def import_textfile(self):
-        if not self.textfile_imported:
-            if os.path.exists(self.path):
-                with open(self.path) as f:
-                    cont = f.read()
-                    parts: list[str] = cont.strip(',\n\t ').split(',')
-                    [self.scryfall_ids.add(x) for x in parts]
+    FLUSH_DELAY: float = 1.5
+    pending: dict[tuple[str, bool], int] = {}
+    flush_timer: threading.Timer | None = None
+    flush_due: float = 0.0
+    lock = threading.RLock()
+    flush_lock = threading.Lock()
+
+    @staticmethod
+    def connect() -> sqlite3.Connection:
+        from useful.update_database import user_datas
+        connection = sqlite3.connect(user_datas)
+        q: str = ('create table if not exists collection '
+                  '(scryfall_id TEXT NOT NULL, foil INTEGER NOT NULL, quantity INTEGER NOT NULL, PRIMARY KEY (scryfall_id, foil))')
+        connection.execute(q)
+        return connection
+
+    def import_collection(self):
+        with Owned.lock:
+            if Owned.imported:
+                return
 
-            Owned.textfile_imported = True
+            connection = Owned.connect()
+            with connection:
+                rows: list[tuple] = connection.execute('select scryfall_id, foil, quantity from collection').fetchall()
+                migrated: bool = not rows and os.path.exists(self.path)
+                if migrated:
+                    with open(self.path) as f:
+                        parts: set[str] = {x for x in f.read().strip(',\n\t ').split(',') if x}
+                    rows = [(x, 0, 1) for x in parts]
+                    connection.executemany('insert or replace into collection values(?,?,?)', rows)
+            connection.close()
 
-    def import_names(self):
-        if not self.names_imported:
-            self.import_textfile()
-            if self.scryfall_ids:
-                scry_ids: list[str] = list(Owned.scryfall_ids)
-                marks: str = ','.join(['?'] * len(scry_ids))
-                q: str = f'select * from cards where scryfall_id in ({marks}) and (side is "a" or side is null)'
-                [self.all_names.add(card[Card.name]) for card in MTGData.cursor.execute(q, scry_ids).fetchall()]
+            if migrated:
+                os.replace(self.path, f'{self.path}.migrated')
+                print(f'\33[33:1:15m{len(rows)}\33[0m owned cards moved from {os.path.basename(self.path)} into the collection table', flush=True)
 
-            Owned.names_imported = True
+            for scryfall_id, foil, quantity in rows:
+                Owned.quantities[scryfall_id, bool(foil)] = quantity
+                Owned.scryfall_ids.add(scryfall_id)
+
+            Owned.generation += 1
+            Owned.imported = True
+
+    def import_names(self):
+        self.import_collection()
+        with Owned.lock:
+            if not self.names_imported:
+                [Owned.count_name(x, 1) for x in Owned.scryfall_ids]
+                Owned.names_imported = True
 
     def update_ownedfile_from_plmtg(self):
         if not self.textfile_updated:
@@ -231,7 +489,7 @@ class Owned:
                 print(f'{path} doesnt exists!')
                 return
 
-            self.import_textfile()
+            self.import_collection()
 
             con = sqlite3.connect(path)
             cur = con.cursor()
@@ -247,9 +505,7 @@ class Owned:
                 print(f'no update needed, couldnt find any new arrived cards')
                 return
             else:
-                marks: str = ','.join(['?'] * len(new_scrys))
-                q: str = f'select * from cards where scryfall_id in ({marks}) and (side is "a" or side is null)'
-                new_cards: list[tuple] = MTGData.cursor.execute(q, list(new_scrys)).fetchall()
+                new_cards: list[tuple] = [card for card in map(get_card, new_scrys) if card]
                 if new_cards:
                     new_cards.sort(key=lambda x: x[Card.name])
                     for n, card in enumerate(new_cards):
@@ -260,20 +516,20 @@ class Owned:
 
                         print(f'\33[38:5:249m{strnum} ADDED TO OWN:\33[33:1:15m {card[Card.name]}\33[0m (\33[38:5:249m{card[Card.setcode]}\33[0m)')
 
-            [self.scryfall_ids.add(x) for x in arrived_scryfall_ids]
+            # the orders are the foil ones
+            [Owned.set_quantity(x, True, 1) for x in new_scrys]
 
-            q: str = 'select scryfall_id from cards'
-            exists: set[str] = {x[0] for x in MTGData.cursor.execute(q).fetchall()}
+            exists: set[str] = MTGData.PRINTINGS.keys() | MTGData.FACES.keys()
             kill: set[str] = {x for x in self.scryfall_ids if x not in exists}
-            [self.scryfall_ids.remove(x) for x in kill]
+            [Owned.set_quantity(x, foil, 0) for x in kill for foil in [False, True]]
 
-            self.save_state_to_file()
+            Owned.flush()
             Owned.textfile_updated = True
 
     @staticmethod
     def get_owned() -> set[str]:
-        if not Owned.textfile_imported:
-            Owned().import_textfile()
+        if not Owned.imported:
+            Owned().import_collection()
 
         return Owned.scryfall_ids
 
@@ -283,64 +539,171 @@ class Owned:
         if not Owned.names_imported:
             Owned().import_names()
 
-        return Owned.all_names
+        return Owned.name_counts.keys()
 
     @staticmethod
-    def add_to_textfile(card_data: tuple, save: bool = True):
-        if not Owned.textfile_imported:
-            Owned().import_textfile()
+    def count_name(scryfall_id: str, step: int):
+        card: tuple | None = get_card(scryfall_id)
+        if card is not None:
+            count: int = Owned.name_counts.get(card[Card.name], 0) + step
+            if count > 0:
+                Owned.name_counts[card[Card.name]] = count
+            else:
+                Owned.name_counts.pop(card[Card.name], None)
 
-        scry: str = card_data[Card.scryfall_id]
-        if scry not in Owned.scryfall_ids:
-            Owned.scryfall_ids.add(scry)
-            Owned.save_state_to_file() if save else ...
+    @staticmethod
+    def get_quantity(scryfall_id: str, foil: bool | None = None) -> int:
+        """foil None counts both"""
+        Owned.get_owned()
+        return sum(Owned.quantities.get((scryfall_id, x), 0) for x in ([False, True] if foil is None else [foil]))
 
     @staticmethod
-    def remove_from_textfile(card_data: tuple, save: bool = True):
-        if not Owned.textfile_imported:
-            Owned().import_textfile()
+    def set_quantity(scryfall_id: str, foil: bool, quantity: int):
+        Owned.get_owned()
+        with Owned.lock:
+            key: tuple[str, bool] = scryfall_id, foil
+            if Owned.quantities.get(key, 0) == max(0, quantity):
+                return
+
+            if quantity > 0:
+                Owned.quantities[key] = quantity
+            else:
+                Owned.quantities.pop(key, None)
+
+            was_owned: bool = scryfall_id in Owned.scryfall_ids
+            if quantity > 0 or (scryfall_id, not foil) in Owned.quantities:
+                Owned.scryfall_ids.add(scryfall_id)
+            else:
+                Owned.scryfall_ids.discard(scryfall_id)
+
+            if Owned.names_imported and was_owned != (scryfall_id in Owned.scryfall_ids):
+                Owned.count_name(scryfall_id, -1 if was_owned else 1)
+
+            Owned.pending[key] = max(0, quantity)
+            Owned.generation += 1
+            Owned.schedule_flush()
 
+    @staticmethod
+    def add_card(card_data: tuple, quantity: int = 1, foil: bool = False):
         scry: str = card_data[Card.scryfall_id]
-        if scry in Owned.scryfall_ids:
-            Owned.scryfall_ids.remove(scry)
-            Owned.save_state_to_file() if save else ...
+        Owned.set_quantity(scry, foil, Owned.get_quantity(scry, foil) + quantity)
+
+    @staticmethod
+    def remove_card(card_data: tuple, foil: bool | None = None):
+        """every copy, foil None removes both"""
+        [Owned.set_quantity(card_data[Card.scryfall_id], x, 0) for x in ([False, True] if foil is None else [foil])]
 
     @staticmethod
-    def save_state_to_file():
-        with open(Owned.path, 'w') as f:
-            f.write(','.join(Owned.scryfall_ids))
-
-class CardMarketPrices:
-    from useful.update_database import price_datas
-    database_integrity(price_datas)
-    fetched_setcodes: set[str] = set()
-    setcode_bag: dict = {}
-    connection = None
-    cursor = None
+    def schedule_flush():
+        """pushes the write FLUSH_DELAY ahead, a burst of clicks ends up as one write"""
+        with Owned.lock:
+            Owned.flush_due = time.time() + Owned.FLUSH_DELAY
+            if Owned.flush_timer is None:
+                Owned.start_flush_timer(Owned.FLUSH_DELAY)
+
+    @staticmethod
+    def start_flush_timer(delay: float):
+        Owned.flush_timer = threading.Timer(delay, Owned.flush_when_due)
+        Owned.flush_timer.daemon = True
+        Owned.flush_timer.start()
+
+    @staticmethod
+    def flush_when_due():
+        with Owned.lock:
+            remaining: float = Owned.flush_due - time.time()
+            if remaining > 0:
+                Owned.start_flush_timer(remaining)
+                return
+
+        Owned.flush()
+
+    @staticmethod
+    def flush():
+        with Owned.flush_lock:
+            with Owned.lock:
+                pending, Owned.pending = Owned.pending, {}
+                Owned.flush_timer.cancel() if Owned.flush_timer is not None else ...
+                Owned.flush_timer = None
+
+            if not pending:
+                return
+
+            connection = Owned.connect()
+            with connection:
+                v: list[tuple] = [(scry, int(foil), quantity) for (scry, foil), quantity in pending.items() if quantity > 0]
+                connection.executemany('insert or replace into collection values(?,?,?)', v)
+                v: list[tuple] = [(scry, int(foil)) for (scry, foil), quantity in pending.items() if quantity <= 0]
+                connection.executemany('delete from collection where scryfall_id is (?) and foil is (?)', v)
+            connection.close()
+
+class Prices:
+    """
+    regular and foil price for every priced printing, two arrays of doubles with rows mapping scryfall_id to a
+    position in them. loaded in one go on a background thread from startup (the consolidated prices table, or every
+    per-setcode table of a database built before it) so hovering, totals and searches never touch sqlite
+    """
+    rows: dict[str, int] = {}
+    regular: array = array('d')
+    foil: array = array('d')
+    loaded = threading.Event()
+    thread: threading.Thread | None = None
+
+    @staticmethod
+    def load():
+        from useful.update_database import price_datas
+        timer_start: float = time.time()
+        try:
+            database_integrity(price_datas)
+            connection = read_only(price_datas)
+            q: str = 'select "name" from sqlite_master where type="table" and "name" not like "sqlite_%"'
+            tables: list[str] = [x[0] for x in connection.execute(q).fetchall()]
+            rows: dict[str, int] = {}
+            regular: array = array('d')
+            foil: array = array('d')
+            for table in ['prices'] if 'prices' in tables else tables:
+                for scry, reg, foil_price in connection.execute(f'select scryfall_id, regular, foil from "{table}"').fetchall():
+                    card: tuple | None = MTGData.PRINTINGS.get(scry)
+                    scry = card[Card.scryfall_id] if card else scry  # shares the string the printing already holds
+                    if scry in rows:  # last row wins, as it always has
+                        regular[rows[scry]], foil[rows[scry]] = reg or 0.0, foil_price or 0.0
+                    else:
+                        rows[scry] = len(regular)
+                        regular.append(reg or 0.0)
+                        foil.append(foil_price or 0.0)
+            connection.close()
+
+            Prices.rows, Prices.regular, Prices.foil = rows, regular, foil
+        except sqlite3.Error as e:
+            print(f'couldnt load prices: {e}', flush=True)
+        finally:
+            Prices.loaded.set()
+
+        timer_end: float = time.time() - timer_start
+        print(f'prices for \33[33:1:15m{len(Prices.rows)}\33[0m printings loaded in {round(timer_end, 2)} seconds', flush=True)
+
+    @staticmethod
+    def preload():
+        if Prices.thread is None:
+            Prices.thread = threading.Thread(target=Prices.load)
+            Prices.thread.daemon = True
+            Prices.thread.start()
+
+    @staticmethod
+    def wait():
+        Prices.preload()
+        Prices.loaded.wait()
+
+def prices_for(scryfall_ids, foil: bool = False) -> array:
+    """one price per scryfall_id in the same order, 0.0 when its not priced"""
+    Prices.wait()
+    prices: array = Prices.foil if foil else Prices.regular
+    rows: dict[str, int] = Prices.rows
+    return array('d', [prices[rows[x]] if x in rows else 0.0 for x in scryfall_ids])
 
 def get_prices(card_data: tuple) -> tuple[float, float]:
-    setcode: str = card_data[Card.setcode]
-    scryid: str = card_data[Card.scryfall_id]
-    obj = CardMarketPrices
-    if setcode in obj.setcode_bag:
-        return obj.setcode_bag[setcode].get(scryid, (0.0, 0.0,))
-
-    elif setcode not in obj.fetched_setcodes:
-        obj.fetched_setcodes.add(setcode)
-        if obj.connection is None:
-            from useful.update_database import price_datas
-            obj.connection = sqlite3.connect(price_datas)
-            obj.cursor = obj.connection.cursor()
-
-        q: str = 'select "name" from sqlite_master where type="table" and "name" is (?)'
-        v: tuple = setcode,
-        if obj.cursor.execute(q, v).fetchone():
-            q: str = f'select scryfall_id, regular, foil from "{setcode}"'
-            all_prices: list = obj.cursor.execute(q).fetchall()
-            obj.setcode_bag[setcode] = {scry: (reg or 0.0, foil or 0.0) for scry, reg, foil in all_prices}
-            return obj.setcode_bag[setcode].get(scryid, (0.0, 0.0,))
-
-    return 0.0, 0.0,
+    Prices.wait()
+    row: int | None = Prices.rows.get(card_data[Card.scryfall_id])
+    return (0.0, 0.0,) if row is None else (Prices.regular[row], Prices.foil[row],)
 
 def get_regular_price(card_data: tuple) -> float:
     reg, _ = get_prices(card_data)
@@ -351,7 +714,7 @@ def get_foil_price(card_data: tuple) -> float:
     return foil
 
 def card_owned(card_data: tuple) -> bool:
-    if not Owned.textfile_imported:
+    if not Owned.imported:
         Owned.get_owned()
 
     return card_data[Card.scryfall_id] in Owned.scryfall_ids
@@ -360,4 +723,7 @@ def name_owned(card_data: tuple) -> bool:
     if not Owned.names_imported:
         Owned.get_owned_names()
 
-    return card_data[Card.name] in Owned.all_names
\ No newline at end of file
+    return card_data[Card.name] in Owned.name_counts
+
+
+atexit.register(Owned.flush)
@@ -1,9 +1,8 @@
 from PIL             import Image
-from PyQt6           import QtCore
 from PyQt6.QtCore    import QObject, pyqtSignal
-from threading       import Lock
 from useful.database import Card, MTGData
-import certifi, copy, io, json, os, pathlib, ssl, sys, time, urllib.request
+from useful.scryfall import Scryfall
+import heapq, io, itertools, json, os, pathlib, sqlite3, sys, threading, time, traceback
 
 
 class LocalImages:
@@ -52,35 +51,22 @@ def webp_path(card_data: tuple) -> str:
     return path
 
 
+def local_image_uri(card_data: tuple) -> str | None:
+    """the uri make_image_uris stored for that face (or the whole card), None when the table or the row is missing"""
+    q: str = 'select uri from image_uris where scryfall_id is (?) and (side is (?) or side is null) order by side is null'
+    v: tuple = card_data[Card.scryfall_id], card_data[Card.side] or 'a',
+    try:
+        row: tuple | None = MTGData.get_cursor().execute(q, v).fetchone()
+    except sqlite3.OperationalError:
+        return None
 
-class Worker(QObject):
-    stop_downloading = pyqtSignal(bool)
-    start_downloading = pyqtSignal(tuple)
-    finished = pyqtSignal(bool)
+    return row[0] if row else None
 
-    def __init__(self, card_data: tuple, lock: Lock, *args, **kwargs):
-        self.errors: list[str] = []
-        self.card_data: tuple = copy.deepcopy(card_data)
-        self.is_halted: bool = False
-        self.lock: Lock = lock
-        super().__init__(*args, **kwargs)
-
-    @QtCore.pyqtSlot()
-    def run(self):
-        self.start_downloading.connect(self.init_download)
-        self.stop_downloading.connect(self.change_momentum)
-        self.start_downloading.emit(self.card_data)
-
-    def init_download(self, card_data: tuple):
-        self.card_data: tuple = copy.deepcopy(card_data)
-        successful = self.start_scryfall_downloading()
-        if self.is_halted is False and self.errors:
-            print('\n'.join(self.errors))
-
-        self.finished.emit(self.is_halted == False and successful == True)
 
-    def change_momentum(self, stop: bool):
-        self.is_halted: bool = stop
+class Worker:
+    def __init__(self, card_data: tuple):
+        self.errors: list[str] = []
+        self.card_data: tuple = card_data
 
     def one_sided_image_uri(self, jsondata: dict) -> str | None:
         try:
@@ -115,124 +101,205 @@ class Worker(QObject):
             return None
 
     def basic_downloading(self, url: str, timeout: float = 5.0) -> io.BytesIO | None:
-        if self.is_halted:
-            return None
-
-        fakefile = io.BytesIO()
-        eof: bool = False
-        try:
-            start_time: float = time.time()
-            if os.name in 'posix':
-                kwgs = dict(url=url)
-            else:
-                ctx = ssl.create_default_context(cafile=certifi.where())
-                kwgs = dict(url=url, context=ctx)
-
-            with urllib.request.urlopen(**kwgs) as plow:
-                while not eof and time.time() < (start_time + timeout) and not self.is_halted:
-                    chunk: bytes = plow.read(8192)
-                    eof: bool = chunk == b''
-                    fakefile.write(chunk) if not eof else ...
-        finally:
-            ...
-        return fakefile if eof else None
+        data: bytes | None = Scryfall.get(url, timeout=timeout)
+        return io.BytesIO(data) if data is not None else None
 
 
     def get_base_url(self) -> str:
-        return f'https://api.scryfall.com/cards/{self.card_data[Card.scryfall_id]}'
+        return f'{Scryfall.API_URL}/cards/{self.card_data[Card.scryfall_id]}'
 
-    def start_scryfall_downloading(self) -> bool | None:
+    def api_image_uri(self) -> str | None:
+        """the image_uri from scryfalls card json, one request more than local_image_uri"""
         card_data: tuple = self.card_data
-        path: str = webp_path(card_data)
-        if os.path.exists(path):
-            return True
-        else:
-            self.lock.acquire(timeout=30)
-            if self.is_halted: # could become halted during aquire (singleton race)
-                if self.lock.locked():
-                    self.lock.release()
-                return None
-
         base_url: str = self.get_base_url()
         fakefile: io.BytesIO | None = self.basic_downloading(url=base_url)
         jsondata: dict | None = self.decode_json(fakefile) if fakefile is not None else None
         if not jsondata:
             text: str = f'couldnt download details for {get_setcode(card_data)} - {card_data[Card.name]}'
             self.errors.append(text)
+            return None
+
+        if not card_data[Card.side]:
+            image_uri: str | None = self.one_sided_image_uri(jsondata) or self.first_side_image_uri(jsondata)
         else:
-            if not card_data[Card.side]:
-                image_uri: str | None = self.one_sided_image_uri(jsondata) or self.first_side_image_uri(jsondata)
-            else:
-                if card_data[Card.side] == 'a':
-                    image_uri: str | None = self.first_side_image_uri(jsondata) or self.one_sided_image_uri(
-                        jsondata)
-                else:
-                    image_uri: str | None = self.second_side_image_uri(jsondata) or self.one_sided_image_uri(
-                        jsondata)
-
-            if image_uri is None:
-                text: str = f'couldnt download details for {get_setcode(card_data)} - {card_data[Card.name]}'
-                self.errors.append(text)
-            elif image_uri == "":
-                text: str = (
-                    f'cannot locate image_uri for {get_setcode(card_data)} - {card_data[Card.name]}\n'
-                    f'JSON-data: {jsondata}'
-                )
-                self.errors.append(text)
+            if card_data[Card.side] == 'a':
+                image_uri: str | None = self.first_side_image_uri(jsondata) or self.one_sided_image_uri(
+                    jsondata)
             else:
-                fakefile: io.BytesIO | None = self.basic_downloading(url=image_uri)
-                im = None
+                image_uri: str | None = self.second_side_image_uri(jsondata) or self.one_sided_image_uri(
+                    jsondata)
+
+        if image_uri is None:
+            text: str = f'couldnt download details for {get_setcode(card_data)} - {card_data[Card.name]}'
+            self.errors.append(text)
+        elif image_uri == "":
+            text: str = (
+                f'cannot locate image_uri for {get_setcode(card_data)} - {card_data[Card.name]}\n'
+                f'JSON-data: {jsondata}'
+            )
+            self.errors.append(text)
+
+        return image_uri or None
+
+    def start_scryfall_downloading(self) -> bool | None:
+        card_data: tuple = self.card_data
+        path: str = webp_path(card_data)
+        if os.path.exists(path):
+            return True
+
+        image_uri: str | None = local_image_uri(card_data) or self.api_image_uri()
+        if image_uri:
+            fakefile: io.BytesIO | None = self.basic_downloading(url=image_uri)
+            im = None
+            try:
+                fakefile.seek(0)
+                im = Image.open(fakefile)
+                im.save(path, format='webp', method=6, quality=80)
+            except FileNotFoundError:
+                subdir: str = get_subdir(card_data)
                 try:
-                    fakefile.seek(0)
+                    pathlib.Path(subdir).mkdir(exist_ok=True, parents=True)
                     im = Image.open(fakefile)
                     im.save(path, format='webp', method=6, quality=80)
-                except FileNotFoundError:
-                    subdir: str = get_subdir(card_data)
-                    try:
-                        pathlib.Path(subdir).mkdir(exist_ok=True, parents=True)
-                        im = Image.open(fakefile)
-                        im.save(path, format='webp', method=6, quality=80)
-                    except PermissionError:
-                        text: str = f'cannot create {subdir} !!!'
-                        self.errors.append(text)
-
-                except AttributeError:
-                    text: str = f'couldnt download "large" image for {get_setcode(card_data)} - {card_data[Card.name]}'
+                except PermissionError:
+                    text: str = f'cannot create {subdir} !!!'
                     self.errors.append(text)
 
-                finally:
-                    if not self.errors and not self.is_halted and im is not None:
-                        sync_sec: float = 1.0
-                        while not os.path.exists(path) and sync_sec > 0.0:
-                            time.sleep(0.1)
-                            sync_sec -= 0.1
-                            try:
-                                os.sync()
-                            except OSError:
-                                ...
-                        if os.path.exists(path):
-                            print(
-                                f'[\33[38:5:249mDOWNLOADED\33[0m] '
-                                f'{get_expname(card_data)}: {card_data[Card.name]} '
-                                f'[\33[38:5:249mWEBP {im.width} x {im.height} -> '
-                                f'\33[33:1:15m{os.path.getsize(path) // 1000}\33[0m kb]'
-                            )
-
-        if self.lock.locked():
-            self.lock.release()
-
-        return None if (self.is_halted or self.errors) else os.path.exists(path)
-
-LOCK: Lock = Lock()
+            except AttributeError:
+                text: str = f'couldnt download "large" image for {get_setcode(card_data)} - {card_data[Card.name]}'
+                self.errors.append(text)
+
+            finally:
+                if not self.errors and im is not None:
+                    sync_sec: float = 1.0
+                    while not os.path.exists(path) and sync_sec > 0.0:
+                        time.sleep(0.1)
+                        sync_sec -= 0.1
+                        try:
+                            os.sync()
+                        except OSError:
+                            ...
+                    if os.path.exists(path):
+                        print(
+                            f'[\33[38:5:249mDOWNLOADED\33[0m] '
+                            f'{get_expname(card_data)}: {card_data[Card.name]} '
+                            f'[\33[38:5:249mWEBP {im.width} x {im.height} -> '
+                            f'\33[33:1:15m{os.path.getsize(path) // 1000}\33[0m kb]'
+                        )
+
+        return None if self.errors else os.path.exists(path)
+
+class Downloads(QObject):
+    """
+    WORKERS threads sharing one priority queue of webp paths, spotlight first, showcases on screen next and
+    offscreen ones last. the same path asked for twice is one download with two callbacks, a job still in the
+    queue can be moved to another priority or dropped once nobody is waiting for it
+    """
+    SPOTLIGHT: int = 0
+    VISIBLE: int = 1
+    OFFSCREEN: int = 2
+
+    WORKERS: int = 4
+    finished = pyqtSignal(str, bool)  # every job, from the worker thread
+    answered = pyqtSignal(str, bool)  # jobs someone waits for, delivered on the main thread
+
+    def __init__(self):
+        super().__init__()
+        self.condition = threading.Condition()
+        self.heap: list[tuple] = []  # (priority, order, path) stale entries are skipped when popped
+        self.queued: dict[str, tuple] = {}  # path -> (heap entry, card_data)
+        self.running: set[str] = set()
+        self.callbacks: dict[str, list] = {}
+        self.order = itertools.count()
+        self.threads: list[threading.Thread] = []
+        self.answered.connect(self.deliver)
+
+    def submit(self, card_data: tuple, callback=None, priority: int = VISIBLE) -> str:
+        path: str = webp_path(card_data)
+        with self.condition:
+            if callback:
+                callbacks: list = self.callbacks.setdefault(path, [])
+                callbacks.append(callback) if callback not in callbacks else ...
+            if path in self.running or (path in self.queued and self.queued[path][0][0] == priority):
+                return path
+
+            entry: tuple = priority, next(self.order), path
+            self.queued[path] = entry, card_data
+            heapq.heappush(self.heap, entry)
+            self.condition.notify()
+
+        while len(self.threads) < self.WORKERS:
+            self.threads.append(threading.Thread(target=self.loop, daemon=True))
+            self.threads[-1].start()
+
+        return path
+
+    def cancel(self, path: str, callback=None):
+        """forgets callback, the job leaves the queue when that was the last one waiting (a running job finishes)"""
+        with self.condition:
+            callbacks: list = self.callbacks.get(path, [])
+            callbacks.remove(callback) if callback in callbacks else ...
+            if not callbacks:
+                self.callbacks.pop(path, None)
+                self.queued.pop(path, None)
+
+    def pending(self) -> int:
+        return len(self.queued) + len(self.running)
+
+    def next_job(self) -> tuple | None:
+        while self.heap:
+            entry: tuple = heapq.heappop(self.heap)
+            path: str = entry[2]
+            if path in self.queued and self.queued[path][0] == entry:
+                _, card_data = self.queued.pop(path)
+                self.running.add(path)
+                return path, card_data
+
+        return None
+
+    def loop(self):
+        while True:
+            with self.condition:
+                job: tuple | None = self.next_job()
+                while job is None:
+                    self.condition.wait()
+                    job: tuple | None = self.next_job()
+
+            path, card_data = job
+            worker = Worker(card_data)
+            try:
+                successful: bool = worker.start_scryfall_downloading() == True
+            except Exception:
+                traceback.print_exc()
+                successful: bool = False
+
+            if worker.errors:
+                print('\n'.join(worker.errors))
+
+            with self.condition:
+                self.running.discard(path)
+                waiting: bool = bool(self.callbacks.get(path))
+                self.callbacks.pop(path, None) if not waiting else ...
+
+            self.finished.emit(path, successful)
+            self.answered.emit(path, successful) if waiting else ...
+
+    def deliver(self, path: str, successful: bool):
+        with self.condition:
+            callbacks: list = self.callbacks.pop(path, [])
+
+        [fn(successful) for fn in callbacks]
+
+DOWNLOADS: Downloads = Downloads()
 
 class CardImageLocation:
     def __init__(self, db_input: tuple):
-        self.thread: None | QtCore.QThread = None
-        self.worker: None | Worker = None
         self.__call__(db_input)
 
     def __call__(self, db_input: tuple):
         self.successful_download: None | bool = None
+        self.finished_fn = None
+        self.priority: int | None = None
         self.db_input = db_input
         self.full_path: str = webp_path(db_input)
         self.image_existed: bool = os.path.exists(self.full_path)
@@ -244,39 +311,17 @@ class CardImageLocation:
         return self.full_path
 
     def stop_download(self):
-        if self.worker and self.successful_download is None:
-            self.worker.stop_downloading.emit(True)
-
-        self.kill_thread()
+        self.priority = None
+        DOWNLOADS.cancel(self.full_path, self.download_finished)
 
-    def kill_thread(self):
-        if self.thread:
-            try:
-                self.thread.quit()
-                self.thread.wait()
-            finally:
-                self.thread = None
-                self.worker = None
-
-    def download_image(self, finished_fn = None):
+    def download_image(self, finished_fn = None, priority: int = Downloads.VISIBLE):
         if self.successful_download is not None: # retry denied
             return
 
-        self.kill_thread()
-
-        self.thread = QtCore.QThread()
-        self.worker = Worker(self.db_input, lock=LOCK)
-        self.worker.moveToThread(self.thread)
-
-        if finished_fn is not None:
-            self.worker.finished.connect(finished_fn)
-
-        self.worker.finished.connect(self.download_finished)
-        self.thread.started.connect(self.worker.run)
-        self.thread.start()
+        self.finished_fn = finished_fn
+        self.priority = priority
+        DOWNLOADS.submit(self.db_input, self.download_finished, priority=priority)
 
     def download_finished(self, successful_download: bool):
         self.successful_download = successful_download
-        self.kill_thread()
-
-        # print(f'downloading was not successful!' if not successful_download else f'downloading was successful!')
+        self.finished_fn(successful_download) if self.finished_fn else ...
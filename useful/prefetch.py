@@ -0,0 +1,112 @@
+from PyQt6.QtCore    import Qt
+from useful.database import Card, Owned, get_card, get_faces
+from useful.images   import DOWNLOADS, LocalImages, webp_path
+from useful.scryfall import Scryfall
+from useful.update_database import user_datas
+import json, os, pickle, sqlite3, threading, time
+
+MANIFEST: str = f'{LocalImages.directory}{os.sep}prefetch_manifest.json'
+
+
+def cards_for(target: str) -> list[tuple]:
+    """every face of what target points at: decks (all saved decks), owned (the collection) or a search query"""
+    if target == 'decks':
+        # the same rows tiny.Settings keeps deckboxes in, one per deck
+        scryfall_ids: set[str] = set()
+        with sqlite3.connect(user_datas) as connection:
+            try:
+                q: str = 'select data from setting_rows where key is (?) and item is not (?)'
+                rows: list[tuple] = connection.execute(q, ('deckboxes', b'',)).fetchall()
+            except sqlite3.OperationalError:
+                rows: list[tuple] = []
+
+        for data, in rows:
+            deck: dict = pickle.loads(data)
+            [scryfall_ids.update(bag) for bag in deck.values() if isinstance(bag, dict)]
+
+    elif target == 'owned':
+        scryfall_ids: set[str] = set(Owned.get_owned())
+
+    else:
+        from useful.breakdown import search_cards, tweak_smartvals
+        scryfall_ids: list[str] = [box['card'][Card.scryfall_id] for box in search_cards(text=tweak_smartvals(target))]
+
+    return [card for scryfall_id in dict.fromkeys(scryfall_ids) for card in get_faces(scryfall_id)]
+
+def load_manifest() -> dict | None:
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(manifest: dict):
+    os.makedirs(LocalImages.directory, exist_ok=True)
+    with open(f'{MANIFEST}.tmp', 'w') as f:
+        json.dump(manifest, f)
+
+    os.replace(f'{MANIFEST}.tmp', MANIFEST)
+
+def prefetch_images(target: str = ''):
+    """
+    downloads every missing image target points at through the download pool. the faces still to go are kept in
+    a manifest next to the images so an interrupted run (or prefetch_images without a target) picks up from there,
+    faces that failed stay in it for the next run
+    """
+    manifest: dict | None = load_manifest()
+    if manifest and manifest['todo'] and manifest['target'] == (target or manifest['target']):
+        print(f'resuming prefetch of "{manifest["target"]}", {len(manifest["todo"])} left', flush=True)
+        cards: list[tuple] = [get_card(scryfall_id, side) for scryfall_id, side in manifest['todo']]
+        cards: list[tuple] = [card for card in cards if card]
+    elif target:
+        cards: list[tuple] = cards_for(target)
+    else:
+        print('prefetch_images wants a target: decks, owned or a search query (setcode==LRW)', flush=True)
+        return
+
+    target: str = target or manifest['target']
+    todo: dict[str, tuple] = {webp_path(card): card for card in cards if not os.path.exists(webp_path(card))}
+    total: int = len(todo)
+    print(f'prefetching \33[33:1:15m{total}\33[0m images for "{target}" ({len(cards) - total} already there)', flush=True)
+
+    finished: list[tuple[str, bool]] = []
+    failed: list[tuple] = []
+    lock = threading.Lock()
+    def collect(path: str, successful: bool):
+        with lock:
+            finished.append((path, successful))
+
+    DOWNLOADS.finished.connect(collect, Qt.ConnectionType.DirectConnection)
+    [DOWNLOADS.submit(card) for card in todo.values()]
+
+    timer_start: float = time.time()
+    done: int = 0
+    try:
+        while todo:
+            time.sleep(1.0)
+            with lock:
+                batch: list[tuple] = finished[:]
+                finished.clear()
+
+            for path, successful in batch:
+                card: tuple | None = todo.pop(path, None)
+                failed.append(card) if card and not successful else ...
+                done += int(bool(card))
+
+            remaining: list[tuple] = list(todo.values()) + failed
+            save_manifest(dict(target=target, todo=[(x[Card.scryfall_id], x[Card.side]) for x in remaining]))
+
+            seconds: float = time.time() - timer_start
+            print(
+                f'prefetched {done}/{total} ({len(failed)} failed) '
+                f'\33[33:1:15m{round(done / seconds, 1)}\33[0m images/sec, {Scryfall.report()}', flush=True
+            )
+    finally:
+        DOWNLOADS.finished.disconnect(collect)
+        [DOWNLOADS.cancel(path) for path in todo]
+
+    if not failed and os.path.exists(MANIFEST):
+        os.remove(MANIFEST)
+
+    timer_end: float = time.time() - timer_start
+    print(f'prefetch of "{target}" done in {round(timer_end, 2)} seconds, {len(failed)} failed', flush=True)
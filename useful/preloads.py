@@ -85,6 +85,30 @@ def preloads(hack_string: str = ''):
         make_prices_db()
         post_exit = True
 
+    if operation('import_image_uris'):
+        from useful.update_database import db_path_card_datas, make_image_uris, optimize_database
+        make_image_uris()
+        optimize_database(db_path_card_datas)
+        post_exit = True
+
+    if operation('optimize_databases'):
+        from useful.update_database import db_path_card_datas, legal_card_datas, optimize_database, price_datas
+        [optimize_database(path) for path in [db_path_card_datas, legal_card_datas, price_datas] if os.path.exists(path)]
+        post_exit = True
+
+    if operation('verify_database'):
+        from useful.update_database import verify_database
+        verify_database()
+        post_exit = True
+
+    if operation('prefetch_images'):
+        # whatever comes after prefetch_images is the target: decks, owned or a search query
+        from useful.prefetch import prefetch_images
+        words: list[str] = args or hack_string.split()
+        n: int = [x.lower().lstrip('-_') for x in words].index('prefetch_images')
+        prefetch_images(' '.join(words[n + 1:]))
+        post_exit = True
+
 
     if post_exit:
         sys.exit()
\ No newline at end of file
@@ -0,0 +1,124 @@
+import certifi, http.client, os, ssl, threading, time, urllib.parse
+
+
+class TokenBucket:
+    """rate tokens a second up to burst, take() reserves one and sleeps off the debt so threads queue fairly"""
+    def __init__(self, rate: float, burst: int):
+        self.rate: float = rate
+        self.burst: int = burst
+        self.tokens: float = float(burst)
+        self.stamp: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        with self.lock:
+            now: float = time.monotonic()
+            self.tokens = min(float(self.burst), self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1.0
+            wait: float = -self.tokens / self.rate if self.tokens < 0.0 else 0.0
+
+        time.sleep(wait) if wait > 0.0 else ...
+        return wait
+
+
+class Scryfall:
+    """
+    keep-alive connections to the scryfall hosts, one per host and thread since http.client isnt thread safe, and
+    a token bucket per host so the download pool stays under scryfalls published rate (10 requests a second
+    against the api). urls are taken as they come so any http host (a local stub server) works the same way
+    """
+    API_URL: str = 'https://api.scryfall.com'
+    RATES: dict[str, tuple[float, int]] = {'api.scryfall.com': (10.0, 10), 'cards.scryfall.io': (20.0, 20)}
+    DEFAULT_RATE: tuple[float, int] = 10.0, 10
+    HEADERS: dict[str, str] = {'User-Agent': 'TinyBuilder/1.0', 'Accept': 'application/json;q=0.9,*/*;q=0.8'}
+
+    buckets: dict[str, TokenBucket] = {}
+    local = threading.local()
+    lock = threading.Lock()
+    counters: dict[str, int | float] = dict(requests=0, bytes=0, seconds=0.0, errors=0, connections=0)
+    context: ssl.SSLContext | None = None
+
+    @staticmethod
+    def bucket(host: str) -> TokenBucket:
+        with Scryfall.lock:
+            if host not in Scryfall.buckets:
+                Scryfall.buckets[host] = TokenBucket(*Scryfall.RATES.get(host, Scryfall.DEFAULT_RATE))
+            return Scryfall.buckets[host]
+
+    @staticmethod
+    def ssl_context() -> ssl.SSLContext:
+        with Scryfall.lock:
+            if Scryfall.context is None:
+                cafile: str | None = None if os.name in 'posix' else certifi.where()
+                Scryfall.context = ssl.create_default_context(cafile=cafile)
+            return Scryfall.context
+
+    @staticmethod
+    def connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        connections: dict = Scryfall.local.__dict__.setdefault('connections', {})
+        connection = connections.get((scheme, netloc))
+        if connection is None:
+            if scheme == 'https':
+                connection = http.client.HTTPSConnection(netloc, timeout=timeout, context=Scryfall.ssl_context())
+            else:
+                connection = http.client.HTTPConnection(netloc, timeout=timeout)
+
+            connections[scheme, netloc] = connection
+            Scryfall.count(connections=1)
+
+        return connection
+
+    @staticmethod
+    def drop(scheme: str, netloc: str):
+        connection = Scryfall.local.__dict__.get('connections', {}).pop((scheme, netloc), None)
+        connection.close() if connection else ...
+
+    @staticmethod
+    def count(**kwargs):
+        with Scryfall.lock:
+            for key, value in kwargs.items():
+                Scryfall.counters[key] += value
+
+    @staticmethod
+    def get(url: str, timeout: float = 5.0) -> bytes | None:
+        """body of a 200 response, None for anything else. a connection the server closed is reopened once"""
+        parts = urllib.parse.urlsplit(url)
+        path: str = f'{parts.path or "/"}?{parts.query}' if parts.query else parts.path or '/'
+        Scryfall.bucket(parts.hostname).take()
+
+        start_time: float = time.monotonic()
+        for attempt in range(2):
+            connection = Scryfall.connection(parts.scheme, parts.netloc, timeout)
+            try:
+                connection.request('GET', path, headers=Scryfall.HEADERS)
+                response = connection.getresponse()
+                data: bytes = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                Scryfall.drop(parts.scheme, parts.netloc)
+                if attempt:
+                    Scryfall.count(requests=1, errors=1, seconds=time.monotonic() - start_time)
+                    return None
+
+        Scryfall.drop(parts.scheme, parts.netloc) if response.will_close else ...
+        ok: bool = response.status == 200
+        Scryfall.count(requests=1, bytes=len(data), seconds=time.monotonic() - start_time, errors=int(not ok))
+        return data if ok else None
+
+    @staticmethod
+    def stats() -> dict[str, int | float]:
+        with Scryfall.lock:
+            stats: dict = dict(Scryfall.counters)
+
+        stats['latency'] = stats['seconds'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    @staticmethod
+    def report() -> str:
+        stats: dict = Scryfall.stats()
+        return (
+            f'\33[33:1:15m{stats["requests"]}\33[0m requests ({stats["errors"]} failed) over '
+            f'{stats["connections"]} connections, {stats["bytes"] // 1000} kb, '
+            f'{round(stats["latency"] * 1000)} ms average'
+        )
@@ -0,0 +1,122 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import time
+
+
+class SetIndex:
+    """
+    sorted views over the sets so year/setcode/expansion comparisons are a bisect instead of a loop over every set.
+    setcode and expansion are sorted on their lowercased form, dates on releasedate_string (year prefixes sorts the
+    same way). setcode_bags is the inverted list from setcode to the bags (NAME_BAG order) that has a printing in it
+    """
+    built: bool = False
+
+    names: dict[str, tuple] = {}  # setcode/expansion -> (sorted lowercased values, setcodes in the same order)
+    dates: list[str] = []
+    years: list[str] = []
+    date_setcodes: list[str] = []
+    setcode_date: dict[str, str] = {}
+
+    setcode_bags: dict[str, array] = {}
+
+    @staticmethod
+    def build():
+        from useful.database import Card, MTGData
+        timer_start: float = time.time()
+        obj = SetIndex
+
+        obj.names = {}
+        for var in ['setcode', 'expansion']:
+            pairs: list[tuple] = [((x if var in 'setcode' else y or '').lower(), x) for x, y in MTGData.SETCODE_EXPNAME.items()]
+            pairs.sort()
+            obj.names[var] = [x for x, _ in pairs], [x for _, x in pairs]
+
+        q: str = 'select setcode, releasedate_string from sets where releasedate_string is not null'
+        obj.setcode_date = {k: v for k, v in MTGData.get_cursor().execute(q).fetchall()}
+        pairs: list[tuple] = sorted((v, k) for k, v in obj.setcode_date.items())
+        obj.dates = [x for x, _ in pairs]
+        obj.years = [x[:4] for x in obj.dates]
+        obj.date_setcodes = [x for _, x in pairs]
+
+        setcode_bags: dict[str, list[int]] = {}
+        for bag_ix, bag in enumerate(MTGData.NAME_BAG.values()):
+            for setcode in {card[Card.setcode] for card in bag.cards}:
+                setcode_bags.setdefault(setcode, []).append(bag_ix)
+        obj.setcode_bags = {k: array('i', v) for k, v in setcode_bags.items()}
+
+        obj.built = True
+        timer_end: float = time.time() - timer_start
+        print(f'set index for \33[33:1:15m{len(obj.setcode_date)}\33[0m sets built in {round(timer_end, 2)} seconds', flush=True)
+
+    @staticmethod
+    def bisect_range(keys: list[str], sep: str, val: str) -> tuple[int, int] | None:
+        """positions in keys where (key sep val) holds, None when sep isnt an ordering/equality"""
+        if '==' in sep:
+            return bisect_left(keys, val), bisect_right(keys, val)
+        elif '>=' in sep:
+            return bisect_left(keys, val), len(keys)
+        elif '<=' in sep:
+            return 0, bisect_right(keys, val)
+        elif '>' in sep:
+            return bisect_right(keys, val), len(keys)
+        elif '<' in sep:
+            return 0, bisect_left(keys, val)
+        return None
+
+    @staticmethod
+    def failing_names(var: str, sep: str, val: str) -> set[str]:
+        """setcodes that fails (val sep lowercased setcode/expansion) the way the searchbar always compared them"""
+        if not SetIndex.built:
+            SetIndex.build()
+
+        keys, setcodes = SetIndex.names[var]
+        if '==' in sep:
+            return {x for key, x in zip(keys, setcodes) if val not in key}
+        elif '!=' in sep:
+            return {x for key, x in zip(keys, setcodes) if val in key}
+
+        # val >= key is key <= val and so on, the value is on the left side of these comparisons
+        flipped: dict[str, str] = {'>=': '<=', '<=': '>=', '>': '<', '<': '>'}
+        span: tuple | None = SetIndex.bisect_range(keys, flipped.get(sep, ''), val)
+        if span is None:
+            return set(setcodes)
+
+        lo, hi = span
+        return set(setcodes[:lo]) | set(setcodes[hi:])
+
+    @staticmethod
+    def failing_years(sep: str, val: str) -> set[str]:
+        """
+        setcodes whose release fails (year sep val). a four digit val compares years, a setcode compares against
+        that sets full release date, anything else is compared to the date string as is
+        """
+        if not SetIndex.built:
+            SetIndex.build()
+
+        keys: list[str] = SetIndex.dates
+        if len(val) == 4 and val.isdigit():
+            keys = SetIndex.years
+        elif val.upper() in SetIndex.setcode_date:
+            val = SetIndex.setcode_date[val.upper()]
+
+        if '!=' in sep:
+            lo, hi = SetIndex.bisect_range(keys, '==', val)
+            return set(SetIndex.date_setcodes[lo:hi])
+
+        span: tuple | None = SetIndex.bisect_range(keys, sep, val)
+        if span is None:
+            return set(SetIndex.date_setcodes)
+
+        lo, hi = span
+        return set(SetIndex.date_setcodes[:lo]) | set(SetIndex.date_setcodes[hi:])
+
+    @staticmethod
+    def bags_in(setcodes: set[str]) -> list[int]:
+        """sorted bag indexes with at least one printing from setcodes"""
+        if not SetIndex.built:
+            SetIndex.build()
+
+        bag_ixs: set[int] = set()
+        for setcode in setcodes:
+            bag_ixs.update(SetIndex.setcode_bags.get(setcode, ()))
+        return sorted(bag_ixs)
@@ -0,0 +1,70 @@
+import gc, hashlib, marshal, mmap, os, time
+
+SNAPSHOT_VERSION: int = 3
+
+
+class Snapshot:
+    """
+    MTGData after the first build (bags, prefered printing, is_stupid and the set lookups) marshalled next to
+    quick_db.sqlite. keyed on size, mtime and a hash of the sqlite header (holds the file change counter) so a
+    rebuilt or updated database makes the snapshot stale and MTGData simply builds and writes a new one
+    """
+    @staticmethod
+    def path_for(db_path: str) -> str:
+        return f'{os.path.splitext(db_path)[0]}.snapshot'
+
+    @staticmethod
+    def signature(db_path: str) -> tuple:
+        try:
+            stat = os.stat(db_path)
+            with open(db_path, 'rb') as f:
+                digest: str = hashlib.sha1(f.read(4096)).hexdigest()
+        except OSError:
+            return ()
+
+        return SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns, digest
+
+    @staticmethod
+    def load(db_path: str, columns: tuple) -> dict | None:
+        """the payload written by save, None when theres no snapshot or its not from this database/layout"""
+        path: str = Snapshot.path_for(db_path)
+        if not os.path.exists(path):
+            return None
+
+        # hundreds of thousands of tuples, the collector has nothing to find among them
+        gc_enabled: bool = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                signature, payload = marshal.loads(mm)
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        finally:
+            gc.enable() if gc_enabled else ...
+
+        if signature != Snapshot.signature(db_path) or payload.get('columns') != columns:
+            return None
+
+        return payload
+
+    @staticmethod
+    def save(db_path: str, payload: dict):
+        path: str = Snapshot.path_for(db_path)
+        tmp_path: str = f'{path}.tmp'
+        timer_start: float = time.time()
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((Snapshot.signature(db_path), payload), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f'couldnt write startup snapshot {path}: {e}', flush=True)
+            return
+
+        timer_end: float = time.time() - timer_start
+        print(f'startup snapshot written in {round(timer_end, 2)} seconds', flush=True)
+
+    @staticmethod
+    def discard(db_path: str):
+        path: str = Snapshot.path_for(db_path)
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,4 +1,4 @@
-import threading, time
+import threading, time, traceback
 from PyQt6.QtCore import pyqtSignal, QObject
 
 class BackgroundThenMain(QObject):
@@ -14,3 +14,59 @@ def custom_thread(fn, delay: int | float):
     t = threading.Thread(target=runner.background, args=(delay,))
     t.daemon = True
     t.start()
+
+
+class LatestOnly(QObject):
+    """
+    runs fn on one background thread, only the newest submit is ever started. every submit bumps generation and
+    results from a generation that has been replaced are dropped before they reach the main thread
+    """
+    finished = pyqtSignal(int, object)
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+        self.generation: int = 0
+        self.pending: tuple | None = None
+        self.condition = threading.Condition()
+        self.thread: threading.Thread | None = None
+
+    def submit(self, *args) -> int:
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, args)
+            self.condition.notify()
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop)
+            self.thread.daemon = True
+            self.thread.start()
+
+        return self.generation
+
+    def cancel(self):
+        """forgets whatever is queued and drops the result of whatever is running"""
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
+
+    def loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+
+                generation, args = self.pending
+                self.pending = None
+
+            try:
+                result = self.fn(*args)
+            except Exception:
+                traceback.print_exc()
+                result = None
+
+            if self.is_current(generation):
+                self.finished.emit(generation, result)
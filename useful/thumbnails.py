@@ -0,0 +1,124 @@
+from PIL              import Image
+from PIL.ImageQt      import ImageQt
+from PyQt6            import QtCore, QtGui
+from cardgeo.cardgeo  import CardGeo
+from collections      import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os, threading, traceback
+
+
+def smart_crop_box(im: Image.Image) -> tuple[int, int, int, int]:
+    """
+    the box inside the cards black border, found by walking in from the left edge at five heights of a
+    CardGeo sized copy until the color jumps. chops 1/75 of each side when that doesnt work out
+    """
+    try:
+        small_im = im.convert('RGB').resize((CardGeo.w, CardGeo.h), resample=Image.Resampling.NEAREST)
+        datas = small_im.getdata()
+
+        yx: dict[int, int] = {(small_im.height // 6) * n: -1 for n in range(1, 6)}
+        w: int = small_im.width
+        for y in yx:
+            row_ix: int = y * w
+            vals: list = [sum(datas[row_ix + x]) for x in range(1, 4)]
+            val: int = sum(vals) // len(vals)
+            min_val: int = max(0, min(val // 2, val - 30))
+            max_val: int = min(int(val * 1.5), 255 * 3)
+
+            for x in range(w // 75, w // 10):
+                ix: int = row_ix + x
+                val: int = sum(datas[ix])
+                if val >= max_val or val <= min_val:
+                    yx[y]: int = x - 1
+                    break
+
+        vals: list[int] = sorted(v for _, v in yx.items() if v > 0)
+        val: int = sum(vals[1:-1]) // len(vals) - 2
+        chop: int = int(val * (im.width / small_im.width))
+        return chop, chop, (im.width - 1) - chop, (im.height - 1) - chop
+
+    except Exception:
+        chop_w: int = im.width // 75
+        chop_h: int = im.height // 75
+        return chop_w, chop_h, (im.width - 1) - chop_w, (im.height - 1) - chop_h
+
+def cropped(path: str) -> Image.Image:
+    im = Image.open(path)
+    return im.crop(smart_crop_box(im))
+
+
+class Thumbnails:
+    """
+    cropped and scaled card images for the labels. QPixmaps are kept in an LRU keyed on (path, w, h) up to BUDGET
+    bytes, below that sit cropped webp thumbnails at WIDTHS in a thumbs dir next to the large image so a miss
+    decodes a small file instead of the large one. missing thumbnails are made on a thread pool (PIL lets go of
+    the GIL while decoding and resizing), the first miss is served from the large image meanwhile
+    """
+    WIDTHS: tuple[int, ...] = CardGeo.min_w * 2, CardGeo.min_w * 3, CardGeo.w, CardGeo.min_w * 6
+    BUDGET: int = 192 * 1024 * 1024
+
+    pixmaps: OrderedDict[tuple, QtGui.QPixmap] = OrderedDict()
+    used: int = 0
+    pending: set[str] = set()
+    lock = threading.Lock()
+    pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+
+    @staticmethod
+    def thumb_path(path: str, width: int) -> str:
+        directory, filename = os.path.split(path)
+        return f'{directory}{os.sep}thumbs{os.sep}{os.path.splitext(filename)[0]}_{width}.webp'
+
+    @staticmethod
+    def make_thumbnails(path: str):
+        try:
+            im = cropped(path)
+            os.makedirs(os.path.dirname(Thumbnails.thumb_path(path, 0)), exist_ok=True)
+            for width in Thumbnails.WIDTHS:
+                height: int = round(width * (im.height / im.width))
+                thumb: str = Thumbnails.thumb_path(path, width)
+                im.resize((width, height), resample=Image.Resampling.LANCZOS).save(f'{thumb}.tmp', format='webp', quality=90)
+                os.replace(f'{thumb}.tmp', thumb)
+        except OSError:
+            traceback.print_exc()
+        finally:
+            with Thumbnails.lock:
+                Thumbnails.pending.discard(path)
+
+    @staticmethod
+    def source(path: str, w: int) -> Image.Image:
+        """the smallest thumbnail at least w wide, the cropped large image when theres none (yet)"""
+        width: int | None = next((x for x in Thumbnails.WIDTHS if x >= w), None)
+        if width and os.path.exists(Thumbnails.thumb_path(path, width)):
+            return Image.open(Thumbnails.thumb_path(path, width))
+
+        with Thumbnails.lock:
+            submit: bool = width is not None and path not in Thumbnails.pending
+            Thumbnails.pending.add(path) if submit else ...
+
+        Thumbnails.pool.submit(Thumbnails.make_thumbnails, path) if submit else ...
+        return cropped(path)
+
+    @staticmethod
+    def pixmap(path: str, w: int, h: int) -> QtGui.QPixmap | None:
+        """None when path isnt an image (yet)"""
+        key: tuple = path, w, h
+        with Thumbnails.lock:
+            if key in Thumbnails.pixmaps:
+                Thumbnails.pixmaps.move_to_end(key)
+                return Thumbnails.pixmaps[key]
+
+        try:
+            im = Thumbnails.source(path, w)
+            qim = ImageQt(im)
+            pixmap = QtGui.QPixmap.fromImage(qim).scaled(w, h, transformMode=QtCore.Qt.TransformationMode(1))
+        except OSError:
+            return None
+
+        with Thumbnails.lock:
+            Thumbnails.pixmaps[key] = pixmap
+            Thumbnails.used += pixmap.width() * pixmap.height() * 4
+            while Thumbnails.used > Thumbnails.BUDGET and len(Thumbnails.pixmaps) > 1:
+                _, old = Thumbnails.pixmaps.popitem(last=False)
+                Thumbnails.used -= old.width() * old.height() * 4
+
+        return pixmap
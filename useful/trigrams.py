@@ -0,0 +1,116 @@
+from array import array
+import time
+
+
+class TrigramIndex:
+    """
+    substring index over a list of lowercased strings, identical strings are indexed once. search returns the
+    positions (into the list it was built from) whose string contains val, negate gives the complement
+    """
+    def __init__(self, strings: list[str | None]):
+        self.size: int = len(strings)
+        self.distinct: list[str] = []
+        self.owners: list[array] = []
+        self.postings: dict[str, array] = {}
+
+        distinct_ix: dict[str, int] = {}
+        for n, string in enumerate(strings):
+            if not isinstance(string, str):
+                continue
+
+            if string not in distinct_ix:
+                distinct_ix[string] = len(self.distinct)
+                self.distinct.append(string)
+                self.owners.append(array('i'))
+
+            self.owners[distinct_ix[string]].append(n)
+
+        for ix, string in enumerate(self.distinct):
+            for gram in {string[n: n + 3] for n in range(len(string) - 2)}:
+                if gram not in self.postings:
+                    self.postings[gram] = array('i')
+                self.postings[gram].append(ix)
+
+    def candidates(self, val: str) -> set[int] | None:
+        """distinct ids that holds every trigram in val, None when val is too short to narrow anything"""
+        grams: set[str] = {val[n: n + 3] for n in range(len(val) - 2)}
+        if not grams:
+            return None
+
+        if any(gram not in self.postings for gram in grams):
+            return set()
+
+        postings: list[array] = sorted((self.postings[gram] for gram in grams), key=len)
+        candidates: set[int] = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+
+        return candidates
+
+    def search(self, val: str, negate: bool = False) -> list[int]:
+        candidates: set[int] | None = self.candidates(val)
+        if candidates is None:
+            hits: list[int] = [ix for ix, string in enumerate(self.distinct) if val in string]
+        else:
+            hits: list[int] = [ix for ix in sorted(candidates) if val in self.distinct[ix]]
+
+        ids: list[int] = sorted(n for ix in hits for n in self.owners[ix])
+        if negate:
+            found: set[int] = set(ids)
+            return [n for n in range(self.size) if n not in found]
+
+        return ids
+
+
+class CardTrigrams:
+    """
+    one index per searchable text column, built on first use. name/type/textbox/keywords are indexed over the
+    prefered printing of every bag in MTGData.NAME_BAG order, artist over every distinct artist and expansion over
+    every expansion name
+    """
+    indexes: dict[str, TrigramIndex] = {}
+    artist_list: list[str] = []
+    setcode_list: list[str] = []
+
+    @staticmethod
+    def get_index(var: str) -> TrigramIndex:
+        if var not in CardTrigrams.indexes:
+            from useful.database import Card, MTGData
+            timer_start: float = time.time()
+            columns: dict[str, int] = dict(name=Card.name, type=Card.type, textbox=Card.text, keywords=Card.keywords)
+            if var in columns:
+                ix: int = columns[var]
+                strings: list[str | None] = [bag.prefered[ix] for bag in MTGData.NAME_BAG.values()]
+            elif var in ['artist']:
+                artists: set = {card[Card.artist] for bag in MTGData.NAME_BAG.values() for card in bag.cards}
+                CardTrigrams.artist_list = sorted(x for x in artists if x is not None)
+                strings: list[str | None] = CardTrigrams.artist_list
+            else:
+                CardTrigrams.setcode_list = sorted(MTGData.SETCODE_EXPNAME)
+                strings: list[str | None] = [MTGData.SETCODE_EXPNAME[x] for x in CardTrigrams.setcode_list]
+
+            lowered: list[str | None] = [x.lower() if isinstance(x, str) else None for x in strings]
+            CardTrigrams.indexes[var] = TrigramIndex(lowered)
+            timer_end: float = time.time() - timer_start
+            print(f'trigram index for {var} built in {round(timer_end, 2)} seconds', flush=True)
+
+        return CardTrigrams.indexes[var]
+
+    @staticmethod
+    def search(var: str, val: str, negate: bool = False) -> list[int]:
+        """bag indexes (NAME_BAG order) whose prefered printing holds val in var"""
+        return CardTrigrams.get_index(var).search(val, negate=negate)
+
+    @staticmethod
+    def matching_artists(val: str) -> set[str]:
+        """original artist strings whose lowercased form holds val"""
+        index: TrigramIndex = CardTrigrams.get_index('artist')
+        return {CardTrigrams.artist_list[n] for n in index.search(val)}
+
+    @staticmethod
+    def matching_setcodes(val: str) -> set[str]:
+        """setcodes whose lowercased expansion name holds val"""
+        index: TrigramIndex = CardTrigrams.get_index('expansion')
+        return {CardTrigrams.setcode_list[n] for n in index.search(val)}
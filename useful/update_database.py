@@ -1,4 +1,4 @@
-import sqlite3, os, time
+import json, pathlib, sqlite3, os, time
 
 names: list[str] = __file__.split(os.sep)
 subdir: str = os.sep.join(x for x in names[:-2])
@@ -7,6 +7,7 @@ db_path_card_datas: str = f'{subdir}{os.sep}quick_db.sqlite'
 legal_card_datas: str = f'{subdir}{os.sep}legal_db.sqlite'
 user_datas: str = f'{subdir}{os.sep}user_datas.sqlite'
 price_datas: str = f'{subdir}{os.sep}setcode_prices.sqlite'
+bulk_card_datas: str = '/home/plutonergy/Coding/PLMTG_v4/default-cards.json'
 fresh_databases: str = f'{subdir}{os.sep}fresh_database.zip'
 
 CARD_COLUMNS: set = {'power', 'toughness', 'cmc', 'name', 'type', 'setcode', 'types', 'text', 'artist', 'scryfall_id',
@@ -26,6 +27,101 @@ BLOCK_SETCODES: set = {'4BB', 'FBB'}
 KEEP_SETCODES: set = {'PHPR', 'ITP', 'CED', 'CEI'}
 KEEP_KEYWORDS: set = {'Portal', }
 
+# what the app looks things up by, price tables from before prices was consolidated gets scryfall_id on top of these
+TABLE_INDEXES: dict[str, list[tuple[str, str]]] = {
+    'cards': [('cards_scryfall_id', 'cards (scryfall_id, side)'), ('cards_name', 'cards (name)'), ('cards_setcode', 'cards (setcode)')],
+    'sets': [('sets_setcode', 'sets (setcode)')],
+    'legalities': [('legalities_name', 'legalities (name)')],
+    'prices': [('prices_scryfall_id', 'prices (scryfall_id)')],
+    'image_uris': [('image_uris_scryfall_id', 'image_uris (scryfall_id, side)')],
+}
+
+PAGE_SIZE: int = 4096
+MMAP_SIZE: int = 256 * 1024 * 1024
+
+def read_only(path: str) -> sqlite3.Connection:
+    """
+    the app never writes to the shipped databases, immutable skips the locking and change checks sqlite otherwise
+    does around every read and mmap lets it read pages without copying them. a missing file opens as before
+    """
+    if not os.path.exists(path):
+        return sqlite3.connect(path)
+
+    connection = sqlite3.connect(f'{pathlib.Path(path).absolute().as_uri()}?mode=ro&immutable=1', uri=True)
+    connection.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    return connection
+
+def wanted_indexes(connection: sqlite3.Connection) -> list[tuple[str, str]]:
+    q: str = 'select "name" from sqlite_master where type="table" and "name" not like "sqlite_%"'
+    indexes: list[tuple[str, str]] = []
+    for table, in connection.execute(q).fetchall():
+        if table in TABLE_INDEXES:
+            indexes += TABLE_INDEXES[table]
+        elif 'scryfall_id' in [x[1] for x in connection.execute(f'PRAGMA table_info("{table}")').fetchall()]:
+            indexes.append((f'{table}_scryfall_id', f'"{table}" (scryfall_id)'))
+    return indexes
+
+def optimize_database(path: str):
+    """indexes, fresh planner statistics and a vacuumed file with PAGE_SIZE pages, the last step of every build"""
+    start: float = time.time()
+    connection = sqlite3.connect(path)
+    indexes: list[tuple[str, str]] = wanted_indexes(connection)
+    with connection:
+        [connection.execute(f'create index if not exists "{name}" on {target}') for name, target in indexes]
+
+    connection.execute('ANALYZE')
+    connection.execute(f'PRAGMA page_size={PAGE_SIZE}')
+    connection.execute('VACUUM')
+    connection.close()
+    print(f'{os.path.basename(path)} optimized, {len(indexes)} indexes ({round(time.time() - start, 4)} sec)', flush=True)
+
+def verify_database():
+    """every shipped database, reports missing indexes and how sqlite plans the lookups the app does"""
+    known_queries: dict[str, list[tuple[str, tuple]]] = {
+        db_path_card_datas: [
+            ('select * from cards where scryfall_id is (?) and (side is "a" or side is null)', ('',)),
+            ('select * from cards where name is (?)', ('',)),
+            ('select setcode, type from sets where setcode in (?)', ('',)),
+            ('select uri from image_uris where scryfall_id is (?) and (side is (?) or side is null)', ('', 'a',)),
+        ],
+        legal_card_datas: [
+            ('select name, csv_status from legalities', ()),
+            ('select csv_status from legalities where name is (?)', ('',)),
+        ],
+        price_datas: [
+            ('select scryfall_id, regular, foil from prices', ()),
+            ('select regular, foil from prices where scryfall_id is (?)', ('',)),
+        ],
+    }
+
+    for path, queries in known_queries.items():
+        if not os.path.exists(path) or not os.path.getsize(path):
+            print(f'\33[31m{os.path.basename(path)} missing or empty\33[0m')
+            continue
+
+        connection = read_only(path)
+        existing: set[str] = {x[0] for x in connection.execute('select "name" from sqlite_master where type="index"').fetchall()}
+        wanted: list[tuple[str, str]] = wanted_indexes(connection)
+        missing: list[str] = [name for name, _ in wanted if name not in existing]
+        analyzed: bool = bool(connection.execute('select 1 from sqlite_master where "name" is "sqlite_stat1"').fetchone())
+        page_size: int = connection.execute('PRAGMA page_size').fetchone()[0]
+
+        status: str = f'\33[31m{len(missing)} missing\33[0m' if missing else f'\33[32mall {len(wanted)} indexes\33[0m'
+        print(f'{os.path.basename(path)}: {status}, {"analyzed" if analyzed else "never analyzed"}, page size {page_size}')
+        [print(f'    \33[38:5:249mmissing\33[0m {name}') for name in missing[:10]]
+        print(f'    \33[38:5:249m...and {len(missing) - 10} more\33[0m') if len(missing) > 10 else ...
+
+        if path in [price_datas] and not connection.execute('select 1 from sqlite_master where "name" is "prices"').fetchone():
+            print(f'    \33[31mper-setcode price tables, rebuild with import_prices to consolidate them\33[0m')
+            queries = []
+
+        for q, v in queries:
+            plan: list[str] = [x[-1] for x in connection.execute(f'EXPLAIN QUERY PLAN {q}', v).fetchall()]
+            color: str = '\33[31m' if any(x.startswith('SCAN') and 'sqlite_master' not in x for x in plan) and 'where' in q else '\33[32m'
+            print(f'    {q}\n        {color}{" / ".join(plan)}\33[0m')
+
+        connection.close()
+
 def make_quick_db():
     print(f'cards-database missing, creating a new', end='', flush=True)
     start: float = time.time()
@@ -145,6 +241,52 @@ def make_quick_db():
     dst_cursor.close()
     dst_connection.close()
     print(f' ({round(time.time() - start, 4)} sec)', flush=True)
+    make_image_uris() if os.path.exists(bulk_card_datas) else ...
+    optimize_database(db_path_card_datas)
+
+def bulk_cards(path: str):
+    """scryfalls bulk files are one big array with a card per line, read line by line instead of all at once"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line: str = line.strip().rstrip(',')
+            if line not in ['[', ']', '']:
+                yield json.loads(line)
+
+def make_image_uris(src_path: str = ''):
+    """
+    large image uri for every printing in cards from scryfalls default_cards bulk file. side a/b for faces with
+    images of their own and null for the whole card, the downloader goes straight to the image with these
+    """
+    print(f'importing image uris', end='', flush=True)
+    start: float = time.time()
+
+    connection = sqlite3.connect(db_path_card_datas)
+    cursor = connection.cursor()
+    q: str = 'select scryfall_id from cards'
+    scry_ids: set[str] = {x[0] for x in cursor.execute(q).fetchall()}
+
+    many: list[tuple] = []
+    for card in bulk_cards(src_path or bulk_card_datas):
+        if card.get('id') not in scry_ids:
+            continue
+
+        uri: str | None = (card.get('image_uris') or {}).get('large')
+        many.append((card['id'], None, uri)) if uri else ...
+        for side, face in zip('ab', card.get('card_faces') or []):
+            uri: str | None = (face.get('image_uris') or {}).get('large')
+            many.append((card['id'], side, uri)) if uri else ...
+
+    with connection:
+        q: str = 'drop table if exists image_uris'
+        cursor.execute(q)
+
+        cursor.execute('create table image_uris (scryfall_id TEXT, side TEXT, uri TEXT)')
+        q: str = 'insert into image_uris values(?,?,?)'
+        cursor.executemany(q, many)
+
+    cursor.close()
+    connection.close()
+    print(f' \33[33:1:15m{len(many)}\33[0m uris ({round(time.time() - start, 4)} sec)', flush=True)
 
 def make_quick_legal_db():
     print(f'legal-database missing, creating a new', end='', flush=True)
@@ -181,7 +323,10 @@ def make_quick_legal_db():
         q: str = 'insert into legalities values(?,?)'
         dst_cursor.executemany(q, many)
 
+    dst_cursor.close()
+    dst_connection.close()
     print(f' ({round(time.time() - start, 4)} sec)', flush=True)
+    optimize_database(legal_card_datas)
 
 
 def make_prices_db():
@@ -189,6 +334,12 @@ def make_prices_db():
     dst_connection = sqlite3.connect(price_datas)
     dst_cursor = dst_connection.cursor()
 
+    # every price goes into one prices table, per-setcode tables from earlier builds goes away
+    with dst_connection:
+        q: str = 'select "name" from sqlite_master where type="table" and "name" not like "sqlite_%"'
+        [dst_cursor.execute(f'drop table if exists "{x[0]}"') for x in dst_cursor.execute(q).fetchall()]
+        dst_cursor.execute('create table prices (scryfall_id TEXT, regular FLOAT, foil FLOAT)')
+
     q: str = 'select scryfall_id from cards where (side is "a" or side is null)'
     scry_ids: set = {x[0] for x in MTGData.cursor.execute(q).fetchall()}
 
@@ -246,13 +397,7 @@ def make_prices_db():
             box.append(tuple(new))
 
         with dst_connection:
-            q = f'drop table if exists "{setcode}"'
-            dst_cursor.execute(q)
-            cols_string: str = ', '.join([f'{x} {"TEXT" if x in "scryfall_id" else "FLOAT"}' for x in dst_cols])
-            q = f'create table "{setcode}" ({cols_string})'
-            dst_cursor.execute(q)
-            marks = ','.join(['?'] * len(dst_cols))
-            q = f'insert into "{setcode}" values ({marks})'
+            q = f'insert into prices ({", ".join(dst_cols)}) values ({",".join(["?"] * len(dst_cols))})'
             dst_cursor.executemany(q, box)
 
         time_taken: float = time.time() - start_time
@@ -264,6 +409,7 @@ def make_prices_db():
 
     dst_cursor.close()
     dst_connection.close()
+    optimize_database(price_datas)
 
 
 